@@ -0,0 +1,173 @@
+# batch.py
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config.settings import settings
+from modules.logger import setup_logger
+from modules.table_formatter import SEGMENT_HEADERS
+
+# Logger setup
+logger = setup_logger()
+
+
+def collect_files(inputs):
+    """
+    Expands directories and glob patterns into a sorted list of EDF files.
+
+    :param inputs: Directories, glob patterns or file paths.
+    :return: List of EDF file paths.
+    """
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            files.update(
+                os.path.join(item, name) for name in os.listdir(item)
+                if name.lower().endswith('.edf')
+            )
+        else:
+            files.update(path for path in glob.glob(item) if os.path.isfile(path))
+    return sorted(files)
+
+
+def process_file(file_path, output_dir, min_duration, lazy_loading, store_dtype=None, band_powers=False,
+                 fft_workers=1):
+    """
+    Segments one EDF file and writes its segment table, text report and summary.
+    Runs in a worker process.
+
+    :param file_path: Path to the EDF file.
+    :param output_dir: Directory for the output files.
+    :param min_duration: Minimum segment duration (in seconds).
+    :param lazy_loading: Whether to read samples on demand instead of preloading.
+    :param store_dtype: Sample type for exporting the segments to a segment store (None to skip).
+    :param band_powers: Whether to write the band powers of the segments.
+    :param fft_workers: Number of threads used for the band power FFTs and for preprocessing.
+    :return: Dictionary with the file summary.
+    """
+    import mne
+    from edf_processor import EDFProcessor
+
+    mne.set_log_level('WARNING')
+    settings.MIN_SEGMENT_DURATION = min_duration
+    settings.LAZY_LOADING = lazy_loading
+    settings.FEATURE_WORKERS = fft_workers
+    settings.PREPROCESSING_WORKERS = fft_workers
+
+    processor = EDFProcessor()
+    processor.load_metadata(file_path)
+    report = processor.output_widget.get_text()
+    metrics = dict(load=processor.metrics.summary())
+    processor.process()
+    report += processor.output_widget.get_text()
+
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    rows = processor.get_segment_rows()
+    with open(os.path.join(output_dir, f"{stem}_segments.csv"), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SEGMENT_HEADERS)
+        writer.writerows(rows)
+    if store_dtype is not None:
+        processor.export_segments(os.path.join(output_dir, f"{stem}.segs"), store_dtype)
+        report += processor.output_widget.get_text().splitlines(keepends=True)[-1]
+    if band_powers:
+        processor.export_band_powers(os.path.join(output_dir, f"{stem}_band_powers.csv"))
+        report += processor.output_widget.get_text().splitlines(keepends=True)[-1]
+    metrics['process'] = processor.metrics.summary()
+    with open(os.path.join(output_dir, f"{stem}_report.txt"), 'w', encoding='utf-8') as f:
+        f.write(report)
+
+    event_counts = {}
+    for row in rows:
+        event_counts[row[3]] = event_counts.get(row[3], 0) + 1
+    summary = dict(
+        file=os.path.abspath(file_path),
+        num_channels=len(processor.raw.ch_names),
+        sampling_frequency=processor.raw.info['sfreq'],
+        recording_duration=float(processor.raw.times[-1]),
+        num_events=len(processor.events),
+        num_segments=len(rows),
+        min_segment_duration=min_duration,
+        segments_per_event=event_counts,
+        metrics=metrics
+    )
+    with open(os.path.join(output_dir, f"{stem}_summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def run_batch(files, output_dir, workers, min_duration, lazy_loading, store_dtype=None, band_powers=False):
+    """
+    Segments EDF files in parallel worker processes.
+
+    :param files: List of EDF file paths.
+    :param output_dir: Directory for the output files.
+    :param workers: Number of worker processes (None for the number of CPUs).
+    :param min_duration: Minimum segment duration (in seconds).
+    :param lazy_loading: Whether to read samples on demand instead of preloading.
+    :param store_dtype: Sample type for exporting the segments to segment stores (None to skip).
+    :param band_powers: Whether to write the band powers of the segments.
+    :return: Tuple of (list of file summaries, dictionary of failed files and errors).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summaries, failures = [], {}
+    # Share the cores between the worker processes and their FFT and preprocessing threads
+    n_cpus = os.cpu_count() or 1
+    fft_workers = max(1, n_cpus // max(1, min(workers or n_cpus, len(files))))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_file, path, output_dir, min_duration, lazy_loading, store_dtype,
+                            band_powers, fft_workers): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                summary = future.result()
+                summaries.append(summary)
+                logger.info(f"Segmented {path}: {summary['num_segments']} segments")
+            except Exception as e:
+                failures[path] = str(e)
+                logger.error(f"Failed to process {path}: {str(e)}")
+
+    summaries.sort(key=lambda s: s['file'])
+    with open(os.path.join(output_dir, "batch_summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(dict(files=summaries, failures=failures), f, indent=2)
+    return summaries, failures
+
+
+def main(argv=None):
+    """
+    Command-line entry point for headless batch segmentation.
+    """
+    parser = argparse.ArgumentParser(description="Split EDF files into event segments without the GUI.")
+    parser.add_argument("inputs", nargs="+", help="EDF files, directories or glob patterns (e.g. 'data/*.edf').")
+    parser.add_argument("-o", "--output-dir", default="segments", help="Directory for the output files.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--min-duration", type=float, default=settings.MIN_SEGMENT_DURATION,
+                        help="Minimum segment duration in seconds.")
+    parser.add_argument("--lazy", action="store_true", default=settings.LAZY_LOADING,
+                        help="Read samples on demand instead of preloading each file.")
+    parser.add_argument("--export-store", nargs="?", const=settings.SEGMENT_STORE_DTYPE, default=None,
+                        choices=["float32", "int16"], metavar="DTYPE",
+                        help="Also export each file's segments to <name>.segs (float32 or int16).")
+    parser.add_argument("--band-powers", action="store_true",
+                        help="Also write the Welch band powers of the segments to <name>_band_powers.csv.")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.inputs)
+    if not files:
+        logger.error("No EDF files found.")
+        return 1
+
+    summaries, failures = run_batch(files, args.output_dir, args.workers, args.min_duration, args.lazy,
+                                    args.export_store, args.band_powers)
+    logger.info(f"Processed {len(summaries)} of {len(files)} files, results written to {args.output_dir}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# benchmarks/run_benchmarks.py
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import mne
+import numpy as np
+from benchmarks.synthetic_edf import generate
+from config.settings import settings
+from edf_processor import EDFProcessor
+from modules.preprocessing import PreprocessingChain, preprocess_recording
+from modules.segment_table import SegmentTable
+from modules.table_formatter import SEGMENT_HEADERS, PagedTable, TableFormatter
+
+# Chain of the preprocessing stage
+PREPROCESSING_CHAIN = PreprocessingChain([("bandpass", {"l_freq": 1.0, "h_freq": 40.0}), ("notch", {"freqs": [50.0]})])
+
+
+def measure(func, repeats):
+    """
+    Measures the run time and peak memory of a function.
+
+    :param func: Function without arguments.
+    :param repeats: Number of timed runs (the fastest is reported).
+    :return: Dictionary with the best and median time (sec) and the peak traced memory (bytes).
+    """
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured in a separate run, as tracing slows the code down
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return dict(time_min=min(times), time_median=float(np.median(times)), peak_memory=peak)
+
+
+def loaded_processor(path):
+    """
+    Returns a processor with a file loaded (metadata cache disabled).
+    """
+    processor = EDFProcessor()
+    processor.load_metadata(path)
+    return processor
+
+
+def benchmark_file(path, repeats):
+    """
+    Benchmarks the pipeline stages on one file.
+
+    :param path: EDF file path.
+    :param repeats: Number of timed runs per stage.
+    :return: Dictionary of stage name -> measurements.
+    """
+    processor = loaded_processor(path)
+    processor.process()
+    raw, events, event_id = processor.raw, processor.events, processor.event_id
+    segment_table = SegmentTable.from_events(raw, events, event_id)
+
+    stages = {
+        'load_metadata': lambda: loaded_processor(path),
+        'process': processor.process,
+        # Segment boundaries and names (formerly the per-segment add_seg loop)
+        'segment_table': lambda: SegmentTable.from_events(raw, events, event_id).min_duration(
+            settings.MIN_SEGMENT_DURATION),
+        # Re-filtering the candidate index (minimum duration changed in the GUI)
+        'segment_filter': processor.select_segments,
+        'format_channel_info': lambda: TableFormatter.format_channel_info(raw.info['chs']),
+        'format_event_info': lambda: TableFormatter.format_event_info(events, raw.info['sfreq'], event_id),
+        'format_segment_table': lambda: PagedTable(SEGMENT_HEADERS, len(segment_table), segment_table.rows).format_all(),
+        'segment_samples': lambda: [segment_table.segment(i).samples for i in range(len(segment_table))],
+        # Preprocessing chain on the continuous recording (without the on-disk cache)
+        'preprocessing': lambda: preprocess_recording(raw, events, PREPROCESSING_CHAIN, np.empty, os.cpu_count() or 1),
+        'band_powers': processor.compute_band_powers,
+        'window_batches': lambda: sum(len(batch) for _, batch in processor.iter_window_batches()),
+        'segment_to_raw': lambda: [segment_table.segment(i).to_raw() for i in range(min(len(segment_table), 10))],
+    }
+    results = {name: measure(func, repeats) for name, func in stages.items()}
+    results['segment_to_raw']['note'] = "first 10 segments"
+    return results
+
+
+def measure_startup(repeats):
+    """
+    Measures the import time of the GUI module (time until the window can be created)
+    and of the processing modules, each in a fresh interpreter.
+
+    :param repeats: Number of runs (the fastest is reported).
+    :return: Dictionary of module name -> best import time (sec).
+    """
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for module in ('gui', 'edf_processor'):
+        code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+        times = [
+            float(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                 cwd=repo_dir).stdout.split()[-1])
+            for _ in range(repeats)
+        ]
+        results[f"import_{module}"] = min(times)
+    return results
+
+
+def git_commit():
+    """
+    Returns the current git commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, threshold):
+    """
+    Compares two benchmark results and prints the stages whose time changed.
+
+    :param baseline: Baseline results (as written by this script).
+    :param current: Current results.
+    :param threshold: Relative slowdown reported as a regression (e.g. 0.2 for 20%).
+    :return: Number of regressions.
+    """
+    baseline_cases = {case['name']: case for case in baseline['cases']}
+    regressions = 0
+    for case in current['cases']:
+        base_case = baseline_cases.get(case['name'])
+        if base_case is None:
+            continue
+        for stage, result in case['stages'].items():
+            base = base_case['stages'].get(stage)
+            if base is None or not base['time_min']:
+                continue
+            ratio = result['time_min'] / base['time_min']
+            memory_ratio = result['peak_memory'] / base['peak_memory'] if base['peak_memory'] else float('nan')
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{case['name']:<40} {stage:<22} time x{ratio:6.2f}  memory x{memory_ratio:6.2f}{flag}")
+    return regressions
+
+
+def parse_list(text, cast):
+    """Parses a comma-separated list."""
+    return [cast(item) for item in text.split(',') if item]
+
+
+def main(argv=None):
+    """
+    Command-line entry point: generates synthetic files, benchmarks each stage and
+    writes the results as JSON.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the EDF segmentation pipeline on synthetic files.")
+    parser.add_argument("--channels", default="10,19", help="Channel layouts (comma-separated: 10, 19, 20).")
+    parser.add_argument("--sfreq", default="250", help="Sampling frequencies in Hz (comma-separated).")
+    parser.add_argument("--duration", default="600,3600", help="Durations in seconds (comma-separated).")
+    parser.add_argument("--events-per-minute", default="2,30", help="Annotation densities (comma-separated).")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per stage.")
+    parser.add_argument("--data-dir", default=None, help="Keep the generated files in this directory.")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="Output JSON file.")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to compare the results with.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown reported as a regression.")
+    args = parser.parse_args(argv)
+
+    mne.set_log_level('ERROR')
+    settings.METADATA_CACHE_ENABLED = False
+
+    grid = itertools.product(
+        parse_list(args.channels, int),
+        parse_list(args.sfreq, int),
+        parse_list(args.duration, float),
+        parse_list(args.events_per_minute, float)
+    )
+    results = dict(
+        commit=git_commit(),
+        timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        mne=mne.__version__,
+        platform=platform.platform(),
+        startup=measure_startup(args.repeats),
+        cases=[]
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_dir = args.data_dir or tmp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for n_channels, sfreq, duration, events_per_minute in grid:
+            name = f"ch{n_channels}_sf{sfreq}_dur{duration:g}_epm{events_per_minute:g}"
+            path = os.path.join(data_dir, f"{name}.edf")
+            if not os.path.exists(path):
+                generate(path, n_channels, sfreq, duration, events_per_minute)
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            results['cases'].append(dict(
+                name=name,
+                channels=n_channels,
+                sfreq=sfreq,
+                duration=duration,
+                events_per_minute=events_per_minute,
+                file_size=os.path.getsize(path),
+                stages=benchmark_file(path, args.repeats)
+            ))
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        return 1 if compare(baseline, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
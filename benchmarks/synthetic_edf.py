@@ -0,0 +1,121 @@
+# benchmarks/synthetic_edf.py
+import argparse
+import numpy as np
+from montage_manager import CHANNELS_10, CHANNELS_20
+
+# Channel layouts matching the built-in montages (the 20-channel caps also record ECG)
+CHANNEL_LAYOUTS = {
+    10: CHANNELS_10,
+    19: CHANNELS_20,
+    20: CHANNELS_20 + ['ECG  ECG'],
+}
+
+EVENT_LABELS = ['Fon', 'OG', 'ZG', 'Photo', 'HV']
+
+
+def make_annotations(duration, events_per_minute, seed=0):
+    """
+    Generates annotations at roughly regular intervals with random jitter.
+
+    :param duration: Recording duration (in seconds).
+    :param events_per_minute: Average number of annotations per minute.
+    :param seed: Seed of the random generator.
+    :return: List of (onset, duration, description) tuples.
+    """
+    rng = np.random.default_rng(seed)
+    n_events = max(1, int(duration * events_per_minute / 60))
+    interval = duration / n_events
+    onsets = np.arange(n_events) * interval + rng.uniform(0, interval / 2, n_events)
+    labels = rng.choice(EVENT_LABELS, n_events)
+    return [(round(float(onset), 3), 0, str(label)) for onset, label in zip(onsets, labels)]
+
+
+def write_edf(path, ch_names, sfreq, duration, annotations, record_duration=1.0, seed=0):
+    """
+    Writes an EDF+ file with random EEG-like samples and annotations.
+
+    :param path: Output file path.
+    :param ch_names: Channel names.
+    :param sfreq: Sampling frequency (samples per record duration must be an integer).
+    :param duration: Recording duration (in seconds, rounded up to whole records).
+    :param annotations: List of (onset, duration, description) tuples.
+    :param record_duration: Duration of one data record (in seconds).
+    :param seed: Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    n_records = int(np.ceil(duration / record_duration))
+    samples_per_record = int(round(sfreq * record_duration))
+
+    # Time-stamped annotation lists (TALs) of each data record
+    record_annotations = [[] for _ in range(n_records)]
+    for onset, ann_duration, description in annotations:
+        record_annotations[min(int(onset // record_duration), n_records - 1)].append((onset, ann_duration, description))
+    tals = []
+    for i, items in enumerate(record_annotations):
+        tal = f"+{i * record_duration:g}\x14\x14\x00".encode('ascii')
+        for onset, ann_duration, description in items:
+            tal += f"+{onset:g}\x15{ann_duration:g}\x14{description}\x14\x00".encode('ascii')
+        tals.append(tal)
+    annotation_samples = max(len(tal) for tal in tals) // 2 + 1
+
+    def field(value, width):
+        return str(value)[:width].ljust(width).encode('ascii')
+
+    labels = list(ch_names) + ["EDF Annotations"]
+    n_signals = len(labels)
+    header = (
+        field("0", 8) + field("X X X X", 80) + field("Startdate 01-JAN-2020 X X X", 80)
+        + field("01.01.20", 8) + field("00.00.00", 8) + field(256 * (n_signals + 1), 8)
+        + field("EDF+C", 44) + field(n_records, 8) + field(f"{record_duration:g}", 8) + field(n_signals, 4)
+    )
+    header += b"".join(field(label, 16) for label in labels)
+    header += b"".join(field("", 80) for _ in labels)  # Transducer type
+    header += b"".join(field("uV", 8) for _ in ch_names) + field("", 8)
+    header += b"".join(field("-3276.8", 8) for _ in ch_names) + field("-1", 8)
+    header += b"".join(field("3276.7", 8) for _ in ch_names) + field("1", 8)
+    header += b"".join(field("-32768", 8) for _ in labels)
+    header += b"".join(field("32767", 8) for _ in labels)
+    header += b"".join(field("", 80) for _ in labels)  # Prefiltering
+    header += b"".join(field(samples_per_record, 8) for _ in ch_names) + field(annotation_samples, 8)
+    header += b"".join(field("", 32) for _ in labels)  # Reserved
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        for i in range(n_records):
+            samples = rng.normal(0, 500, (len(ch_names), samples_per_record)).astype('<i2')
+            f.write(samples.tobytes())
+            f.write(tals[i].ljust(annotation_samples * 2, b"\x00"))
+
+
+def generate(path, n_channels=19, sfreq=250, duration=600, events_per_minute=2, seed=0):
+    """
+    Writes a synthetic recording with one of the clinic channel layouts.
+
+    :param path: Output file path.
+    :param n_channels: Number of channels (10, 19 or 20; 20 includes an ECG channel).
+    :param sfreq: Sampling frequency (in Hz).
+    :param duration: Recording duration (in seconds).
+    :param events_per_minute: Average number of annotations per minute.
+    :param seed: Seed of the random generator.
+    """
+    write_edf(path, CHANNEL_LAYOUTS[n_channels], sfreq, duration,
+              make_annotations(duration, events_per_minute, seed), seed=seed)
+
+
+def main(argv=None):
+    """
+    Command-line entry point for generating a synthetic EDF file.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic EDF+ file with annotations.")
+    parser.add_argument("path", help="Output file path.")
+    parser.add_argument("--channels", type=int, choices=sorted(CHANNEL_LAYOUTS), default=19, help="Channel layout.")
+    parser.add_argument("--sfreq", type=int, default=250, help="Sampling frequency (Hz).")
+    parser.add_argument("--duration", type=float, default=600, help="Duration (seconds).")
+    parser.add_argument("--events-per-minute", type=float, default=2, help="Annotation density.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args(argv)
+    generate(args.path, args.channels, args.sfreq, args.duration, args.events_per_minute, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,43 @@
 # config/settings.py
+import os
+
 class Settings:
     TABLE_FORMAT = "pretty"  # Table format (pretty, grid, html, etc.)
+    STARTUP_TIME_TARGET = 0.5  # Time until the window appears; exceeding it is logged as a warning (in seconds)
+    WARM_UP_IMPORTS = True  # Import the processing modules in the background once the window is shown
+    TABLE_PAGE_SIZE = 500  # Number of table rows formatted and displayed at a time
     MIN_SEGMENT_DURATION = 5.0  # Minimum segment duration (in seconds)
+    LOAD_CHUNK_DURATION = 60.0  # Amount of data read per step when loading or streaming (in seconds)
+    PRELOAD_MEMORY_LIMIT = 4 * 2 ** 30  # Larger recordings are streamed from disk instead of preloaded (in bytes)
+    SESSION_MEMORY_BUDGET = 4 * 2 ** 30  # Samples kept in memory for all open recordings (in bytes)
+    CHANNEL_INCLUDE = []  # Channels to read (names or glob patterns such as "EEG *"); all channels if empty
+    CHANNEL_EXCLUDE = ["ECG  ECG"]  # Channels never read (names or glob patterns), applied after CHANNEL_INCLUDE
+    LAZY_LOADING = False  # Read only the header and annotations on open; read samples on demand
+    SEGMENT_STORE_DTYPE = "float32"  # Sample type of exported segment stores (float32 or int16)
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "edf_segment_processor")  # Directory for on-disk caches
+    METADATA_CACHE_ENABLED = True  # Reuse parsed headers, events and tables of previously opened files
+    METADATA_CACHE_MAX_SIZE = 256 * 2 ** 20  # Maximum size of the metadata cache (in bytes)
+    SEGMENT_INDEX_PATH = os.path.join(CACHE_DIR, "segment_index.sqlite")  # Segment index across recordings (see indexer.py)
+    PREPROCESSING = [  # Preprocessing chain applied to the recording before segmentation (empty for none), e.g.
+        # ("bandpass", {"l_freq": 1.0, "h_freq": 40.0}), ("notch", {"freqs": [50.0]}),
+        # ("resample", {"sfreq": 125.0}), ("reference", {"ref_channels": "average"})
+    ]
+    PREPROCESSING_WORKERS = -1  # Threads used for preprocessing (-1 for all cores)
+    PREPROCESSING_BLOCK_MEMORY = 256 * 2 ** 20  # Samples filtered at once by each thread (at least one channel; in bytes)
+    PREPROCESSING_CACHE_MAX_SIZE = 16 * 2 ** 30  # Maximum size of the preprocessed recordings cache (in bytes)
+    FREQUENCY_BANDS = {  # Frequency bands of the band power features (in Hz, lower bound included)
+        'delta': (1.0, 4.0),
+        'theta': (4.0, 8.0),
+        'alpha': (8.0, 13.0),
+        'beta': (13.0, 30.0),
+    }
+    WINDOW_DURATION = 4.0  # Length of the fixed windows cut from the segments (in seconds)
+    WINDOW_OVERLAP = 0.5  # Overlap of consecutive fixed windows (fraction of the window)
+    WINDOW_BATCH_SIZE = 1024  # Maximum number of fixed windows per batch
+    WINDOW_READ_DURATION = 600.0  # Data read at once when streaming windows of a recording that is not preloaded (in seconds)
+    PSD_WINDOW_DURATION = 2.0  # Length of the Welch windows (in seconds)
+    PSD_OVERLAP = 0.5  # Overlap of consecutive Welch windows (fraction of the window)
+    FEATURE_BATCH_MEMORY = 64 * 2 ** 20  # Samples transformed at once when computing features (in bytes)
+    FEATURE_WORKERS = -1  # Threads used for the FFTs (-1 for all cores)
 
 settings = Settings()
\ No newline at end of file
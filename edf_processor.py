@@ -1,49 +1,150 @@
 # edf_processor.py
+import os
+import threading
 import mne
-from mne.viz import plot_montage
+import numpy as np
 import montage_manager
-import tkinter as tk
 from config.settings import settings
-from modules.event_processor import EventProcessor
-from modules.table_formatter import TableFormatter
+from modules.table_formatter import SEGMENT_HEADERS, PagedTable, TableFormatter
+from modules.segment_table import SegmentTable
+from modules.segment_windows import SegmentWindows
+from modules.edf_reader import open_edf
+from modules.metadata_cache import MetadataCache
+from modules.metrics import StageMetrics
+from modules.preprocessing import PreprocessingChain, PreprocessedCache
+from modules.topomap_cache import TopomapCache
+from modules.segment_store import SegmentStore
+from modules.spectral_features import segment_band_powers
+from modules.stream_reader import stream_segments
+from modules.exceptions import ProcessingCancelled
 from modules.logger import setup_logger
+from modules.text_output import END, TextOutput
 
 # Logger setup
 logger = setup_logger()
 
 class EDFProcessor:
-    def __init__(self, output_widget):
+    def __init__(self, output_widget=None, progress_callback=None):
         """
         Initializes the EDF file processor.
 
-        :param output_widget: Widget for text output (e.g., ScrolledText).
+        :param output_widget: Widget for text output (e.g., ScrolledText); text is collected
+                              in a TextOutput when omitted (headless processing).
+        :param progress_callback: Function called with (stage, done, total) while loading
+                                  ("load", bytes), segmenting ("segments", segments),
+                                  exporting ("export", segments) and computing
+                                  features ("features", Welch windows).
         """
-        self.seg_dict = {}  # Dictionary to store segments
-        self.output_widget = output_widget  # Widget for outputting information
-        self.raw = None  # EDF file data
+        self.seg_dict = {}  # Segments selected by the filters, by name (SegmentTable after processing)
+        self.segment_table = None  # All event-to-event segments (candidate index, built once per file)
+        self.from_events = None  # Names of the events segments may start with (None for all)
+        self.to_events = None  # Names of the events segments may end with (None for all)
+        self.output_widget = output_widget if output_widget is not None else TextOutput()  # Widget for outputting information
+        self.progress_callback = progress_callback  # Progress reporting function
+        self._file_raw = None  # EDF file opened without loading the samples (read from disk on demand)
+        self._loaded_raw = None  # RawArray with the samples in memory (None if they are read from disk)
+        self._deferred_path = None  # File to open on first access to raw (metadata loaded from the cache)
         self.events = None  # Events from annotations
         self.event_id = None  # Event identifiers
+        self.montage = None  # Montage applied to the data
+        self._unloaded = False  # The preloaded samples were released (see unload_data)
+        self.preprocessed = None  # (cache key, recording, events) after the preprocessing chain (see preprocess)
+        self.metadata_cache = MetadataCache(settings.CACHE_DIR, settings.METADATA_CACHE_MAX_SIZE)
+        self.topomap_cache = TopomapCache(os.path.join(settings.CACHE_DIR, 'topomaps'))
+        self.preprocessed_cache = PreprocessedCache(os.path.join(settings.CACHE_DIR, 'preprocessed'),
+                                                    settings.PREPROCESSING_CACHE_MAX_SIZE)
+        self._cancel_event = threading.Event()  # Set to stop loading or processing
+        self.metrics = StageMetrics()  # Duration and memory of the stages of the last run
+
+    @property
+    def raw(self):
+        """
+        EDF file data: the recording with its samples in memory if they are loaded,
+        otherwise the file, read from disk on demand. When the metadata was loaded from
+        the cache, the file is opened on first access.
+        """
+        if self._file_raw is None and self._deferred_path is not None:
+            file_path = self._deferred_path
+            self._deferred_path = None
+            try:
+                self._open_raw(file_path)
+            except Exception:
+                self._deferred_path = file_path
+                raise
+        return self._loaded_raw if self._loaded_raw is not None else self._file_raw
+
+    def _close_raw(self):
+        """
+        Forgets the open recording.
+        """
+        self._file_raw = None
+        self._loaded_raw = None
+        self._deferred_path = None
+
+    def cancel(self):
+        """
+        Requests cancellation of the running load or processing (safe to call from another thread).
+        """
+        self._cancel_event.set()
+
+    def _check_cancelled(self):
+        """
+        Raises ProcessingCancelled if cancellation has been requested.
+        """
+        if self._cancel_event.is_set():
+            raise ProcessingCancelled("Operation cancelled by the user.")
+
+    def _report_progress(self, stage, done, total):
+        """
+        Passes progress information to the progress callback, if any.
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
 
     def load_metadata(self, file_path):
         """
-        Loads metadata from an EDF file.
+        Loads metadata from an EDF file. The montage is not plotted (see montage_image).
 
         :param file_path: Path to the EDF file.
         """
+        self._cancel_event.clear()
+        self.metrics.start_run(file=os.path.basename(file_path))
         try:
             # Clear the output field before loading new data
-            self.output_widget.delete(1.0, tk.END)
-
-            # Load data from the EDF file
-            self.raw = mne.io.read_raw_edf(file_path, preload=True)
-
-            # Remove the ECG channel if it exists
-            if 'ECG  ECG' in self.raw.ch_names:
-                self.raw.drop_channels(['ECG  ECG'])
-                self.output_widget.insert(tk.END, "ECG channel removed.\n")
+            self.output_widget.delete(1.0, END)
+            self._close_raw()
+            self.montage = None
+            self._unloaded = False
+            self.preprocessed = None
+            self.seg_dict = {}
+            self.segment_table = None
+            self.from_events = None
+            self.to_events = None
+
+            # Reuse the parsed metadata if the file was opened before
+            cache_key = None
+            if settings.METADATA_CACHE_ENABLED:
+                cache_key = MetadataCache.file_key(file_path, settings.TABLE_FORMAT, settings.CHANNEL_INCLUDE,
+                                                   settings.CHANNEL_EXCLUDE)
+                cached = self.metadata_cache.get(cache_key)
+                if cached is not None:
+                    self.events, self.event_id = cached['events'], cached['event_id']
+                    self._deferred_path = file_path  # The file is opened when the data is needed
+                    self.metrics.tag(channels=len(cached['ch_names']))
+                    with self.metrics.stage('montage_apply'):
+                        self.montage = montage_manager.MontageManager.get_montage(cached['ch_names'])
+                    self.output_widget.insert(END, "Metadata loaded from cache.\n")
+                    with self.metrics.stage('table_formatting'):
+                        self.output_widget.insert(END, cached['header'])
+                        self.output_event_info(cached['sfreq'])
+                    self.metrics.log_summary()
+                    return
+
+            self._open_raw(file_path)
 
             # Get events from annotations
-            self.events, self.event_id = mne.events_from_annotations(self.raw)
+            with self.metrics.stage('events_from_annotations'):
+                self.events, self.event_id = mne.events_from_annotations(self.raw)
 
             # Get subject information
             subject_info = self.raw.info.get('subject_info', {})
@@ -54,34 +155,157 @@ class EDFProcessor:
             output_lines.append(f"Number of channels: {num_channels}\n")
             output_lines.append(f"Sampling frequency: {self.raw.info['sfreq']} Hz\n")
 
-            # Apply montage (if available)
-            montage = montage_manager.MontageManager.get_montage(num_channels)
-            if montage:
-                self.raw.set_montage(montage)
-                self.output_widget.insert(tk.END, "Montage successfully applied.\n")
-                # Visualize the montage in 3D
-                fig = plot_montage(
-                    montage,
-                    kind='topomap',
-                    show_names=True,  # Show channel names
-                    sphere='auto',  # Automatically adjust sphere parameters
-                    scale=1.2  # Increase point size
-                )
-
-            else:
-                self.output_widget.insert(tk.END, "Montage not applied: unsuitable number of channels.\n")
-
             # Output channel and event information
-            output_lines.append(self.display_channel_names())
-            output_lines.append(self.get_event_info())
-            self.output_widget.insert(tk.END, ''.join(output_lines))
+            with self.metrics.stage('table_formatting'):
+                output_lines.append(self.display_channel_names())
+                header = ''.join(output_lines)
+                self.output_widget.insert(END, header)
+                self.output_event_info(self.raw.info['sfreq'])
+
+            if cache_key is not None:
+                self.metadata_cache.put(cache_key, dict(
+                    events=self.events,
+                    event_id=self.event_id,
+                    ch_names=list(self.raw.ch_names),
+                    sfreq=self.raw.info['sfreq'],
+                    header=header
+                ))
+            self.metrics.log_summary()
+
+        except ProcessingCancelled:
+            self._close_raw()
+            self.output_widget.insert(END, "Loading cancelled.\n")
+            raise
 
         except Exception as e:
             # Log the error and display a message
             logger.error(f"Failed to load metadata: {str(e)}", exc_info=True)  # Added exc_info for details
-            self.output_widget.insert(tk.END, f"Error: {str(e)}\n")
+            self.output_widget.insert(END, f"Error: {str(e)}\n")
             raise Exception(f"Failed to load metadata: {str(e)}")
 
+    def _open_raw(self, file_path):
+        """
+        Opens an EDF file without the channels outside the channel selection, loads the
+        samples (unless lazy loading is enabled) and applies the montage. The open file
+        and the loaded samples become the processor's recording (see raw).
+
+        :param file_path: Path to the EDF file.
+        """
+        # Read the header and annotations of the EDF file; excluded channels (settings.CHANNEL_INCLUDE
+        # and CHANNEL_EXCLUDE) are never read
+        with self.metrics.stage('edf_read'):
+            raw, excluded = open_edf(file_path)
+            self.metrics.tag(channels=len(raw.ch_names))
+        if excluded:
+            self.output_widget.insert(END, f"Channels not read: {', '.join(excluded)}\n")
+
+        # Load the samples (unless they are read on demand in lazy mode, or the recording
+        # is too large to fit in memory and is streamed from disk instead)
+        data_size = len(raw.ch_names) * raw.n_times * np.dtype(np.float64).itemsize
+        loaded_raw = None
+        if settings.LAZY_LOADING:
+            self.output_widget.insert(END, "Lazy loading: samples are read from disk on demand.\n")
+        elif data_size > settings.PRELOAD_MEMORY_LIMIT:
+            self.output_widget.insert(
+                END, f"Recording too large to load into memory ({data_size / 2 ** 30:.1f} GB): "
+                     f"samples are streamed from disk.\n"
+            )
+        else:
+            with self.metrics.stage('data_load'):
+                loaded_raw = self._load_data(raw, os.path.getsize(file_path))
+
+        # Apply montage (if available)
+        with self.metrics.stage('montage_apply'):
+            montage = montage_manager.MontageManager.get_montage(raw.ch_names)
+            if montage:
+                raw.set_montage(montage, on_missing='ignore')
+                if loaded_raw is not None:
+                    loaded_raw.set_montage(montage, on_missing='ignore')
+                self.montage = montage
+                self.output_widget.insert(END, "Montage successfully applied.\n")
+            else:
+                self.output_widget.insert(END, "Montage not applied: no matching electrode layout.\n")
+        self._file_raw = raw
+        self._loaded_raw = loaded_raw
+
+    def _load_data(self, raw, file_size):
+        """
+        Reads all samples of a raw object into memory in chunks, reporting progress
+        and checking for cancellation between chunks.
+
+        :param raw: Raw object opened without preloading (not modified).
+        :param file_size: Size of the EDF file in bytes (used for progress reporting).
+        :return: RawArray with the samples, the measurement info and the annotations.
+        """
+        n_times = raw.n_times
+        chunk_size = max(1, int(settings.LOAD_CHUNK_DURATION * raw.info['sfreq']))
+        data = np.empty((len(raw.ch_names), n_times))
+        for start in range(0, n_times, chunk_size):
+            self._check_cancelled()
+            stop = min(start + chunk_size, n_times)
+            data[:, start:stop] = raw.get_data(start=start, stop=stop)
+            self._report_progress("load", int(file_size * stop // n_times), file_size)
+
+        loaded_raw = mne.io.RawArray(data, raw.info, first_samp=raw.first_samp, copy='info', verbose=False)
+        loaded_raw.set_annotations(raw.annotations)
+        return loaded_raw
+
+    def data_size(self):
+        """
+        Returns the size of the samples held in memory.
+
+        :return: Size in bytes (0 if the samples are read from disk on demand).
+        """
+        raw = self._loaded_raw
+        return len(raw.ch_names) * raw.n_times * np.dtype(np.float64).itemsize if raw is not None else 0
+
+    def unload_data(self):
+        """
+        Releases the preloaded samples, keeping the metadata, events and segment tables.
+        Samples are read from disk on demand afterwards, until reload_data is called.
+        """
+        loaded_raw = self._loaded_raw
+        if loaded_raw is not None:
+            # The recording reads from its file again
+            self._loaded_raw = None
+            self._unloaded = True
+            self._replace_raw(loaded_raw)
+
+    def reload_data(self):
+        """
+        Loads the samples again after unload_data.
+        """
+        if self._unloaded:
+            self._cancel_event.clear()
+            raw = self._file_raw
+            with self.metrics.stage('data_load'):
+                self._loaded_raw = self._load_data(raw, os.path.getsize(raw.filenames[0]))
+            self._unloaded = False
+            self._replace_raw(raw)
+
+    def _replace_raw(self, old_raw):
+        """
+        Points the segment tables built on a recording at the current one (see raw),
+        after the samples were released or loaded again.
+
+        :param old_raw: Recording the tables may refer to.
+        """
+        for table in (self.segment_table, self.seg_dict):
+            if isinstance(table, SegmentTable) and table.raw is old_raw:
+                table.raw = self.raw
+
+    def montage_image(self):
+        """
+        Returns the topomap of the applied montage. It is rendered on the first request
+        and cached per montage, so repeated views of the same layout are not re-rendered.
+
+        :return: PNG image (bytes), or None if no montage is applied.
+        """
+        if self.montage is None:
+            return None
+        with self.metrics.stage('montage_plot'):
+            return self.topomap_cache.get(self.montage)
+
     @staticmethod
     def format_subject_info(subject_info):
         """
@@ -129,80 +353,135 @@ class EDFProcessor:
         """
         return f"\nChannel Information:\n{table}\n{description}\n"
 
-    def get_event_info(self):
+    def insert_table(self, table):
         """
-        Returns event information as a table.
+        Outputs a paged table. Output widgets that support paging (insert_table) format
+        and display it page by page; otherwise the whole table is inserted as text.
 
-        :return: String containing the event table.
+        :param table: PagedTable object.
         """
-        if self.events is None:
-            return "No events available in annotations.\n"
-        return f"\nNumber of events: {len(self.events)}\nEvent List:\n{TableFormatter.format_event_info(self.events, self.raw.info['sfreq'], self.event_id)}\n"
+        if hasattr(self.output_widget, 'insert_table'):
+            self.output_widget.insert_table(table)
+            self.output_widget.insert(END, "\n")
+        else:
+            self.output_widget.insert(END, table.format_all() + "\n")
 
-    def add_seg(self, s_idx, e_idx, raw, evts, ev_id):
+    def output_event_info(self, sfreq):
         """
-        Adds a segment to the segment dictionary.
+        Outputs the number of events and the event table.
 
-        :param s_idx: Index of the start event.
-        :param e_idx: Index of the end event.
-        :param raw: EDF file data.
-        :param evts: List of events.
-        :param ev_id: Event identifiers.
+        :param sfreq: Sampling frequency of the recording.
         """
-        s_t = self.events[s_idx, 0] / raw.info['sfreq']
-        e_t = self.events[e_idx, 0] / raw.info['sfreq'] if e_idx is not None else raw.times[-1]
-
-        # Skip segments shorter than the minimum duration
-        if e_t - s_t < settings.MIN_SEGMENT_DURATION:
+        if self.events is None:
+            self.output_widget.insert(END, "No events available in annotations.\n")
             return
-
-        # Get the name of the current and next event
-        evt_code = self.events[s_idx, 2]
-        evt_name = EventProcessor.get_event_name(evt_code, ev_id)
-        next_evt = "End" if e_idx is None else EventProcessor.get_event_name(self.events[e_idx, 2], ev_id)
-
-        # Generate a unique segment name
-        seg_name = EventProcessor.generate_segment_name(evt_name, self.seg_dict.keys())
-
-        # Create the segment
-        seg_data = raw.copy().crop(tmin=s_t, tmax=e_t)
-        self.seg_dict[seg_name] = dict(
-            start_time=s_t,
-            end_time=e_t,
-            current_event=evt_name,
-            next_event=next_evt,
-            data=seg_data
-        )
+        self.output_widget.insert(END, f"\nNumber of events: {len(self.events)}\nEvent List:\n")
+        self.insert_table(TableFormatter.event_table(self.events, sfreq, self.event_id))
 
     def process(self):
         """
         Processes the EDF file data and splits it into segments.
         """
+        self._cancel_event.clear()
+        self.metrics.start_run(file=self.metrics.context.get('file'), channels=self.metrics.context.get('channels'))
+
         # Clear the output field before starting processing
-        self.output_widget.delete(1.0, tk.END)
+        self.output_widget.delete(1.0, END)
 
         if self.raw is not None:
-            self.output_widget.insert(tk.END, "Starting processing...\n")
+            self.output_widget.insert(END, "Starting processing...\n")
 
             # Check for sufficient number of events
             if len(self.events) < 2:
-                self.output_widget.insert(tk.END, "Insufficient events to extract segments.\n")
+                self.output_widget.insert(END, "Insufficient events to extract segments.\n")
                 return
 
-            # Split into segments
-            for i in range(len(self.events) - 1):
-                self.add_seg(i, i + 1, self.raw, self.events, self.event_id)
-
-            # Add the last segment
-            self.add_seg(len(self.events) - 1, None, self.raw, self.events, self.event_id)
+            # Split into segments: compute all event-to-event segments once per file (the last
+            # one ends at the end of the recording), then keep those that pass the filters
+            self._check_cancelled()
+            raw, events = self.preprocess()
+            with self.metrics.stage('segmentation'):
+                if self.segment_table is None or self.segment_table.raw is not raw:
+                    self.segment_table = SegmentTable.from_events(raw, events, self.event_id)
+                self.seg_dict = self.select_segments()
+            self.metrics.tag(segments=len(self.seg_dict))
+            self._report_progress("segments", len(self.events), len(self.events))
 
             # Output the results
-            self.output_results()
+            with self.metrics.stage('results_output'):
+                self.output_results()
+            self.metrics.log_summary()
 
         else:
             logger.error("Please select an EDF file for processing first.")
             raise Exception("Please select an EDF file for processing first.")
 
+    def preprocess(self):
+        """
+        Applies the preprocessing chain (settings.PREPROCESSING) to the recording, once per
+        file and chain: the result is cached on disk, keyed by the file, the channel selection
+        and the chain parameters (see PreprocessedCache), and memory-mapped from there.
+
+        :return: Tuple of (recording to segment, its events): the preprocessed recording,
+                 or the original one if the chain is empty.
+        """
+        chain = PreprocessingChain(settings.PREPROCESSING)
+        if not chain:
+            return self.raw, self.events
+
+        raw = self.raw
+        key = PreprocessedCache.file_key(self._file_raw.filenames[0], chain, settings.CHANNEL_INCLUDE, settings.CHANNEL_EXCLUDE)
+        if self.preprocessed is None or self.preprocessed[0] != key:
+            def progress(done, total):
+                self._check_cancelled()
+                self._report_progress("preprocessing", done, total)
+
+            with self.metrics.stage('preprocessing'):
+                result = self.preprocessed_cache.get(key)
+                if result is not None:
+                    self.output_widget.insert(END, "Preprocessed recording loaded from cache.\n")
+                else:
+                    workers = settings.PREPROCESSING_WORKERS if settings.PREPROCESSING_WORKERS > 0 else os.cpu_count() or 1
+                    result = self.preprocessed_cache.put(key, raw, self.events, chain, workers, progress)
+                    self.output_widget.insert(
+                        END, f"Preprocessing applied: {', '.join(name for name, _ in chain.steps)}\n"
+                    )
+            self.preprocessed = (key, *result)
+        return self.preprocessed[1], self.preprocessed[2]
+
+    def select_segments(self):
+        """
+        Selects the candidate segments of sufficient duration that match the event filters.
+
+        :return: SegmentTable with the selected segments.
+        """
+        mask = self.segment_table.records['duration'] >= settings.MIN_SEGMENT_DURATION
+        if self.from_events is not None:
+            mask &= self.segment_table.event_mask('from_code', self.from_events)
+        if self.to_events is not None:
+            mask &= self.segment_table.event_mask('to_code', self.to_events)
+        return self.segment_table.filter(mask)
+
+    def filter_segments(self, from_events=None, to_events=None):
+        """
+        Re-applies the minimum duration and sets the event filters, then outputs the results.
+        Only the candidate index is filtered: no samples are read or copied.
+
+        :param from_events: Names of the events segments may start with (None for all).
+        :param to_events: Names of the events segments may end with (None for all).
+        """
+        if self.segment_table is None:
+            raise Exception("Please split the file into segments first.")
+        self.from_events = set(from_events) if from_events is not None else None
+        self.to_events = set(to_events) if to_events is not None else None
+
+        self.output_widget.delete(1.0, END)
+        with self.metrics.stage('segment_filter'):
+            self.seg_dict = self.select_segments()
+        self.metrics.tag(segments=len(self.seg_dict))
+        with self.metrics.stage('results_output'):
+            self.output_results()
+
     def output_results(self):
         """
         Outputs the processing results (dictionary structure and segment data).
@@ -216,31 +495,163 @@ class EDFProcessor:
             ["", "end_time", "float", "15.00"],
             ["", "current_event", "str", "Fon"],
             ["", "next_event", "str", "OG"],
-            ["", "data", "RawEDF", "RawEDF Object"]
+            ["", "data", "RawArray", "Built on access"]
         ]
         structure_table = TableFormatter.format_table(structure_data, headers="firstrow")
-        self.output_widget.insert(tk.END, "Segment Dictionary Structure:\n")
-        self.output_widget.insert(tk.END, structure_table + "\n\n")
-
-        # Prepare data for the segment table
-        table_data = []
-        valid_segments_count = 0
-        for seg_name, t in self.seg_dict.items():
-            duration = t['end_time'] - t['start_time']
-            if duration >= settings.MIN_SEGMENT_DURATION:
-                table_data.append([
-                    seg_name,
-                    f"{t['start_time']:.3f}",
-                    f"{t['end_time']:.3f}",
-                    t['current_event'],
-                    t['next_event'],
-                    f"{duration:.3f}"
-                ])
-                valid_segments_count += 1
+        self.output_widget.insert(END, "Segment Dictionary Structure:\n")
+        self.output_widget.insert(END, structure_table + "\n\n")
 
         # Output segment data
-        headers = ["Segment", "Start", "End", "From", "To", "Duration"]
-        table = TableFormatter.format_table(table_data, headers)
-        self.output_widget.insert(tk.END, f"Number of segments with duration >= {settings.MIN_SEGMENT_DURATION} sec: {valid_segments_count}\n")
-        self.output_widget.insert(tk.END, "Segment Data:\n")
-        self.output_widget.insert(tk.END, table + "\n")
\ No newline at end of file
+        if self.from_events is not None:
+            self.output_widget.insert(END, f"From events: {', '.join(sorted(self.from_events))}\n")
+        if self.to_events is not None:
+            self.output_widget.insert(END, f"To events: {', '.join(sorted(self.to_events))}\n")
+        self.output_widget.insert(END, f"Number of segments with duration >= {settings.MIN_SEGMENT_DURATION} sec: {len(self.seg_dict)}\n")
+        self.output_widget.insert(END, "Segment Data:\n")
+        self.insert_table(PagedTable(SEGMENT_HEADERS, len(self.seg_dict), self.seg_dict.rows))
+
+    def get_segment_rows(self):
+        """
+        Returns the segments that satisfy the minimum duration as table rows.
+
+        :return: List of [name, start, end, from event, to event, duration] rows.
+        """
+        if not self.seg_dict:
+            return []
+        return self.seg_dict.rows()
+
+    def _chunk_size(self):
+        """
+        Returns the number of samples read per step when loading or streaming.
+        """
+        return max(1, int(settings.LOAD_CHUNK_DURATION * self.seg_dict.raw.info['sfreq']))
+
+    def iter_segment_data(self):
+        """
+        Streams the samples of the segments in chunks of bounded size (see stream_segments),
+        reading the recording once. Works whether or not the data is preloaded.
+
+        :return: Generator of (segment name, offset, samples) tuples; consecutive pieces
+                 of a segment start at increasing offsets (in samples).
+        """
+        if not self.seg_dict:
+            return
+        names = self.seg_dict.names
+        for row, offset, samples in stream_segments(self.seg_dict, self._chunk_size()):
+            self._check_cancelled()
+            yield names[row], offset, samples
+
+    def export_segments(self, store_path, dtype='float32'):
+        """
+        Writes the segments to a segment store (see SegmentStore).
+
+        :param store_path: Directory of the store.
+        :param dtype: Sample type: 'float32' or 'int16'.
+        """
+        self._cancel_event.clear()
+        if not self.seg_dict:
+            raise Exception("Please split the file into segments first.")
+
+        def progress(done, total):
+            self._check_cancelled()
+            self._report_progress("export", done, total)
+
+        with self.metrics.stage('segment_export'):
+            n_bytes = SegmentStore.write(store_path, self.seg_dict, dtype=dtype, progress=progress,
+                                         chunk_size=self._chunk_size())
+        self.output_widget.insert(
+            END, f"Exported {len(self.seg_dict)} segments ({n_bytes / 2 ** 20:.1f} MB, {dtype}) to {store_path}\n"
+        )
+        self.metrics.log_summary()
+
+    def segment_windows(self, duration=None, overlap=None):
+        """
+        Returns fixed-length windows inside the segments (see SegmentWindows).
+
+        :param duration: Window length (in seconds); settings.WINDOW_DURATION if None.
+        :param overlap: Overlap of consecutive windows (fraction); settings.WINDOW_OVERLAP if None.
+        :return: SegmentWindows object.
+        """
+        if not self.seg_dict:
+            raise Exception("Please split the file into segments first.")
+        return SegmentWindows(
+            self.seg_dict,
+            settings.WINDOW_DURATION if duration is None else duration,
+            settings.WINDOW_OVERLAP if overlap is None else overlap
+        )
+
+    def iter_window_batches(self, batch_size=None, duration=None, overlap=None):
+        """
+        Streams fixed-length windows of the segments in batches (see SegmentWindows.iter_batches).
+
+        :param batch_size: Maximum number of windows per batch; settings.WINDOW_BATCH_SIZE if None.
+        :param duration: Window length (in seconds); settings.WINDOW_DURATION if None.
+        :param overlap: Overlap of consecutive windows (fraction); settings.WINDOW_OVERLAP if None.
+        :return: Generator of (window index rows, windows (n_windows, n_channels, n_samples)) pairs.
+        """
+        self._cancel_event.clear()
+        windows = self.segment_windows(duration, overlap)
+        read_size = max(1, int(settings.WINDOW_READ_DURATION * self.seg_dict.raw.info['sfreq']))
+        for rows, batch in windows.iter_batches(batch_size or settings.WINDOW_BATCH_SIZE, read_size):
+            self._check_cancelled()
+            yield rows, batch
+
+    def compute_band_powers(self):
+        """
+        Computes the Welch band powers (settings.FREQUENCY_BANDS) of every segment and channel.
+
+        :return: BandPowers table (segments x channels x bands).
+        """
+        self._cancel_event.clear()
+        if not self.seg_dict:
+            raise Exception("Please split the file into segments first.")
+
+        def progress(done, total):
+            self._check_cancelled()
+            self._report_progress("features", done, total)
+
+        with self.metrics.stage('band_powers'):
+            band_powers = segment_band_powers(
+                self.seg_dict,
+                settings.FREQUENCY_BANDS,
+                settings.PSD_WINDOW_DURATION,
+                overlap=settings.PSD_OVERLAP,
+                batch_memory=settings.FEATURE_BATCH_MEMORY,
+                workers=settings.FEATURE_WORKERS,
+                progress=progress
+            )
+        self.metrics.log_summary()
+        return band_powers
+
+    def export_band_powers(self, path):
+        """
+        Computes the band powers of the segments and writes them to a CSV file
+        (one row per segment and channel, one column per band).
+
+        :param path: Output file path.
+        """
+        band_powers = self.compute_band_powers()
+        band_powers.write_csv(path)
+        self.output_widget.insert(
+            END, f"Band powers of {len(band_powers.segment_names)} segments x {len(band_powers.ch_names)} channels "
+                 f"x {len(band_powers.band_names)} bands written to {path}\n"
+        )
+
+    def import_segments(self, store_path):
+        """
+        Opens a segment store and outputs its segment table.
+
+        :param store_path: Directory of the store.
+        :return: SegmentStore object.
+        """
+        store = SegmentStore(store_path)
+        self.output_widget.delete(1.0, END)
+        self.output_widget.insert(
+            END,
+            f"Segment store: {store_path}\n"
+            f"Source file: {store.meta.get('source')}\n"
+            f"Channels: {len(store.ch_names)}, sampling frequency: {store.sfreq} Hz, sample type: {store.dtype.name}\n"
+            f"Number of segments: {len(store)}\n"
+        )
+        self.insert_table(PagedTable(SEGMENT_HEADERS, len(store), store.rows))
+        return store
@@ -1,13 +1,31 @@
 # gui.py
+import base64
+import itertools
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from edf_processor import EDFProcessor
+from recording_session import RecordingSession
 from config.settings import settings
+from modules.exceptions import ProcessingCancelled
+from modules.logger import setup_logger
+from modules.text_output import QueueOutput
 
-def create_gui():
+# Logger setup
+logger = setup_logger()
+
+def create_gui(start_time=None):
     """
     Creates a graphical user interface for processing EDF files.
 
+    The processing modules (MNE, SciPy, matplotlib) are not imported here: they are
+    imported on a background thread once the window is shown (settings.WARM_UP_IMPORTS),
+    or when the first file is opened.
+
+    :param start_time: time.perf_counter() value at application start; if given, the time
+                       until the window appears is logged and compared with
+                       settings.STARTUP_TIME_TARGET.
     :return: The root window of the application.
     """
     # Create the main window
@@ -43,13 +61,117 @@ def create_gui():
             if min_duration <= 0:
                 raise ValueError("Duration must be greater than 0.")
             settings.MIN_SEGMENT_DURATION = min_duration  # Update value in settings
-            messagebox.showinfo("Success", f"Minimum duration set: {min_duration} sec.")
+            if not refilter_segments():
+                messagebox.showinfo("Success", f"Minimum duration set: {min_duration} sec.")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
 
     # Button to apply minimum duration
     ttk.Button(settings_frame, text="Apply", command=apply_min_duration).pack(side=tk.LEFT, padx=5)
 
+    # Event filters (segments starting / ending with an event type)
+    ALL_EVENTS = "All"
+    ttk.Label(settings_frame, text="From event:").pack(side=tk.LEFT, padx=(15, 5))
+    from_event_combo = ttk.Combobox(settings_frame, values=[ALL_EVENTS], state="readonly", width=12)
+    from_event_combo.set(ALL_EVENTS)
+    from_event_combo.pack(side=tk.LEFT, padx=5)
+    ttk.Label(settings_frame, text="To event:").pack(side=tk.LEFT, padx=5)
+    to_event_combo = ttk.Combobox(settings_frame, values=[ALL_EVENTS], state="readonly", width=12)
+    to_event_combo.set(ALL_EVENTS)
+    to_event_combo.pack(side=tk.LEFT, padx=5)
+
+    def refilter_segments():
+        """
+        Filters the segments of the current file with the minimum duration and the selected
+        events, without processing the file again.
+
+        :return: True if the segments were filtered, False if there are no segments yet
+                 or a background task is running.
+        """
+        if session.active_path is None or btn_cancel.instate(['!disabled']):
+            return False
+        processor = session.active
+        if processor.segment_table is None:
+            return False
+        from_event, to_event = from_event_combo.get(), to_event_combo.get()
+        processor.filter_segments(
+            from_events=None if from_event == ALL_EVENTS else [from_event],
+            to_events=None if to_event == ALL_EVENTS else [to_event]
+        )
+        status_label.config(text=f"Segments: {len(processor.seg_dict)} of {len(processor.segment_table)}")
+        return True
+
+    def update_event_filters():
+        """
+        Fills the event filters with the event types of the active recording and shows
+        its selected events.
+        """
+        processor = session.active
+        for combo, column, selected in ((from_event_combo, 'from_code', processor.from_events),
+                                        (to_event_combo, 'to_code', processor.to_events)):
+            event_types = processor.segment_table.event_types(column) if processor.segment_table is not None else []
+            combo.config(values=[ALL_EVENTS] + event_types)
+            combo.set(next(iter(selected)) if selected else ALL_EVENTS)
+
+    from_event_combo.bind("<<ComboboxSelected>>", lambda e: refilter_segments())
+    to_event_combo.bind("<<ComboboxSelected>>", lambda e: refilter_segments())
+
+    # Checkbox for lazy loading (samples are read from disk only when segments need them)
+    lazy_loading_var = tk.BooleanVar(value=settings.LAZY_LOADING)
+
+    def toggle_lazy_loading():
+        """
+        Applies the lazy loading mode for files opened afterwards.
+        """
+        settings.LAZY_LOADING = lazy_loading_var.get()
+
+    ttk.Checkbutton(settings_frame, text="Lazy loading", variable=lazy_loading_var,
+                    command=toggle_lazy_loading).pack(side=tk.LEFT, padx=15)
+
+    # Open recordings (switching keeps the other recordings and their segments in memory)
+    ttk.Label(settings_frame, text="Recording:").pack(side=tk.LEFT, padx=5)
+    recording_combo = ttk.Combobox(settings_frame, values=[], state="readonly", width=60)
+    recording_combo.pack(side=tk.LEFT, padx=5)
+
+    def update_recordings():
+        """
+        Shows the open recordings, the active one and the memory used by their samples.
+        """
+        recording_combo.config(values=list(session.recordings))
+        recording_combo.set(session.active_path or "")
+        update_event_filters()
+        status_label.config(
+            text=f"Samples in memory: {session.memory_usage() / 2 ** 20:.0f} of {session.memory_budget / 2 ** 20:.0f} MB"
+        )
+
+    def select_recording(event=None):
+        """
+        Activates the recording selected in the list.
+        """
+        file_path = recording_combo.get()
+        if btn_cancel.instate(['!disabled']) or file_path == session.active_path:
+            recording_combo.set(session.active_path or "")
+            return
+        run_in_background(lambda: session.activate(file_path), on_success=update_recordings)
+
+    recording_combo.bind("<<ComboboxSelected>>", select_recording)
+
+    def close_recording():
+        """
+        Closes the active recording and activates the most recently used of the others.
+        """
+        if session.active_path is None or btn_cancel.instate(['!disabled']):
+            return
+        session.close(session.active_path)
+        file_path = session.active_path
+        if file_path is not None:
+            run_in_background(lambda: session.activate(file_path), on_success=update_recordings)
+        else:
+            clear_output()
+            update_recordings()
+
+    ttk.Button(settings_frame, text="Close", command=close_recording).pack(side=tk.LEFT, padx=5)
+
     # Output text area (ScrolledText)
     output_area = scrolledtext.ScrolledText(main_frame, width=100, height=25, wrap=tk.WORD)
     output_area.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -71,12 +193,152 @@ def create_gui():
     output_area.bind("<Control-c>", copy_text)
     output_area.bind("<Control-C>", copy_text)
 
+    # Paged tables: only the displayed pages are formatted; a link loads the next page
+    output_area.tag_configure("page_link", foreground="blue", underline=True)
+    output_area.tag_bind("page_link", "<Enter>", lambda e: output_area.config(cursor="hand2"))
+    output_area.tag_bind("page_link", "<Leave>", lambda e: output_area.config(cursor=""))
+    link_ids = itertools.count()
+
+    def insert_table_page(table, start, index):
+        """
+        Formats one page of a paged table and inserts it into the output area, followed
+        by a link that loads the next page.
+
+        :param table: PagedTable object.
+        :param start: Index of the first row of the page.
+        :param index: Text index at which the page is inserted.
+        """
+        stop = min(start + settings.TABLE_PAGE_SIZE, table.n_rows)
+        output_area.mark_set("page_insert", index)
+        output_area.mark_gravity("page_insert", tk.RIGHT)
+        output_area.insert("page_insert", table.format_page(start, stop))
+        if stop < table.n_rows:
+            link_tag = f"page_link_{next(link_ids)}"
+            next_stop = min(stop + settings.TABLE_PAGE_SIZE, table.n_rows)
+            output_area.insert("page_insert", "\n")
+            output_area.insert("page_insert", f"[Show rows {stop + 1}-{next_stop} of {table.n_rows}]",
+                               ("page_link", link_tag))
+            output_area.tag_bind(link_tag, "<Button-1>", lambda e: show_next_page(table, stop, link_tag))
+
+    def show_next_page(table, start, link_tag):
+        """
+        Replaces a "Show rows" link with the next page of its table.
+
+        :param table: PagedTable object.
+        :param start: Index of the first row of the page.
+        :param link_tag: Tag of the clicked link.
+        """
+        link_start, link_end = output_area.tag_ranges(link_tag)
+        output_area.delete(link_start, link_end)
+        output_area.tag_delete(link_tag)
+        insert_table_page(table, start, link_start)
+
+    def clear_output():
+        """
+        Clears the output area and the links of its paged tables.
+        """
+        output_area.delete(1.0, tk.END)
+        for tag in output_area.tag_names():
+            if tag.startswith("page_link_"):
+                output_area.tag_delete(tag)
+
     # Frame for buttons
     button_frame = ttk.Frame(main_frame)
     button_frame.pack(fill=tk.X)
 
-    # Create an instance of EDFProcessor for data processing
-    processor = EDFProcessor(output_area)
+    # Queue for messages from the worker thread (output text, progress, completion)
+    message_queue = queue.Queue()
+
+    # Session of open recordings (one EDFProcessor each); their output and progress
+    # are passed through the queue and applied to the widgets on the Tk event loop
+    session = RecordingSession(
+        QueueOutput(message_queue),
+        progress_callback=lambda stage, done, total: message_queue.put(('progress', (stage, done, total)))
+    )
+
+    def run_in_background(task, on_success=None):
+        """
+        Runs a processing task on a worker thread, keeping the interface responsive.
+
+        :param task: Function to run on the worker thread.
+        :param on_success: Function to call on the GUI thread after the task completes.
+        """
+        def worker():
+            try:
+                task()
+                message_queue.put(('done', on_success))
+            except ProcessingCancelled:
+                message_queue.put(('cancelled', None))
+            except Exception as e:
+                message_queue.put(('error', str(e)))
+
+        for button in (btn_open, btn_process, btn_montage, btn_export, btn_features, btn_import):
+            button.config(state=tk.DISABLED)
+        btn_cancel.config(state=tk.NORMAL)
+        progress_bar.config(value=0)
+        status_label.config(text="Working...")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def finish_background_task(status):
+        """
+        Restores the controls after a background task ends.
+
+        :param status: Text to show in the status label.
+        """
+        for button in (btn_open, btn_process, btn_montage, btn_export, btn_features, btn_import):
+            button.config(state=tk.NORMAL)
+        btn_cancel.config(state=tk.DISABLED)
+        status_label.config(text=status)
+
+    def show_progress(stage, done, total):
+        """
+        Updates the progress bar and status label.
+
+        :param stage: "load" (bytes read), "preprocessing" (chunks read and channel blocks filtered),
+                      "segments" (segments built), "export" (segments written) or
+                      "features" (Welch windows transformed).
+        :param done: Amount of work done.
+        :param total: Total amount of work.
+        """
+        progress_bar.config(value=100 * done / total if total else 0)
+        if stage == "load":
+            status_label.config(text=f"Reading: {done / 2 ** 20:.1f} of {total / 2 ** 20:.1f} MB")
+        elif stage == "export":
+            status_label.config(text=f"Exported: {done} of {total} segments")
+        elif stage == "preprocessing":
+            status_label.config(text=f"Preprocessing: {done} of {total}")
+        elif stage == "features":
+            status_label.config(text=f"Band powers: {done} of {total} windows")
+        else:
+            status_label.config(text=f"Segments: {done} of {total}")
+
+    def poll_messages():
+        """
+        Applies messages from the worker thread to the widgets (runs on the Tk event loop).
+        """
+        try:
+            while True:
+                kind, payload = message_queue.get_nowait()
+                if kind == 'insert':
+                    output_area.insert(tk.END, payload)
+                elif kind == 'delete':
+                    clear_output()
+                elif kind == 'table':
+                    insert_table_page(payload, 0, tk.END)
+                elif kind == 'progress':
+                    show_progress(*payload)
+                elif kind == 'done':
+                    finish_background_task("Done.")
+                    if payload is not None:
+                        payload()
+                elif kind == 'cancelled':
+                    finish_background_task("Cancelled.")
+                elif kind == 'error':
+                    finish_background_task("Error.")
+                    messagebox.showerror("Error", payload)  # Show error if something goes wrong
+        except queue.Empty:
+            pass
+        root.after(50, poll_messages)
 
     def select_file():
         """
@@ -87,26 +349,145 @@ def create_gui():
             filetypes=[("EDF files", "*.edf"), ("All files", "*.*")]
         )
         if file_path:
-            try:
-                processor.load_metadata(file_path)  # Load metadata
-            except Exception as e:
-                messagebox.showerror("Error", str(e))  # Show error if something goes wrong
+            # Load metadata in the background
+            run_in_background(lambda: session.open(file_path), on_success=update_recordings)
 
     # "Open EDF File" button
     btn_open = ttk.Button(button_frame, text="Open EDF File", command=select_file)
     btn_open.pack(side=tk.LEFT, padx=5, pady=5)
 
     # "Split into Segments" button
-    btn_process = ttk.Button(button_frame, text="Split into Segments", command=processor.process)
+    btn_process = ttk.Button(button_frame, text="Split into Segments",
+                             command=lambda: run_in_background(session.active.process, on_success=update_event_filters))
     btn_process.pack(side=tk.LEFT, padx=5, pady=5)
 
+    def show_montage():
+        """
+        Shows the topomap of the applied montage (rendered on first request, then cached).
+        """
+        try:
+            image = session.active.montage_image()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to render montage: {str(e)}")
+            return
+        if image is None:
+            messagebox.showinfo("Montage", "No montage is applied to the loaded file.")
+            return
+        montage_window = tk.Toplevel(root)
+        montage_window.title("Montage")
+        photo = tk.PhotoImage(master=montage_window, data=base64.b64encode(image))
+        label = ttk.Label(montage_window, image=photo)
+        label.image = photo  # Keep a reference, Tk does not
+        label.pack(padx=10, pady=10)
+
+    # "Show Montage" button
+    btn_montage = ttk.Button(button_frame, text="Show Montage", command=show_montage)
+    btn_montage.pack(side=tk.LEFT, padx=5, pady=5)
+
+    def export_segments():
+        """
+        Asks for a location and exports the segments to a segment store.
+        """
+        store_path = filedialog.asksaveasfilename(
+            title="Export Segments",
+            defaultextension=".segs",
+            filetypes=[("Segment stores", "*.segs")]
+        )
+        if store_path:
+            run_in_background(lambda: session.active.export_segments(store_path, settings.SEGMENT_STORE_DTYPE))
+
+    def export_band_powers():
+        """
+        Asks for a location and writes the band powers of the segments to a CSV file.
+        """
+        path = filedialog.asksaveasfilename(
+            title="Export Band Powers",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv")]
+        )
+        if path:
+            run_in_background(lambda: session.active.export_band_powers(path))
+
+    def import_segments():
+        """
+        Asks for a segment store and shows its segments.
+        """
+        store_path = filedialog.askdirectory(title="Open Segment Store")
+        if store_path:
+            try:
+                session.active.import_segments(store_path)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to open segment store: {str(e)}")
+
+    # "Export Segments" button
+    btn_export = ttk.Button(button_frame, text="Export Segments", command=export_segments)
+    btn_export.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # "Band Powers" button
+    btn_features = ttk.Button(button_frame, text="Band Powers", command=export_band_powers)
+    btn_features.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # "Open Segment Store" button
+    btn_import = ttk.Button(button_frame, text="Open Segment Store", command=import_segments)
+    btn_import.pack(side=tk.LEFT, padx=5, pady=5)
+
+    def show_stats():
+        """
+        Shows the duration and memory change of each stage of the last run.
+        """
+        from modules.table_formatter import TableFormatter
+
+        summary = session.active.metrics.summary()
+        if not summary['stages']:
+            messagebox.showinfo("Stats", "No stages have been run yet.")
+            return
+        stats_window = tk.Toplevel(root)
+        stats_window.title("Stage Stats")
+        stats_area = scrolledtext.ScrolledText(stats_window, wrap=tk.NONE, width=80, height=20)
+        stats_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        stats_area.insert(tk.END, TableFormatter.format_stage_metrics(summary))
+        stats_area.config(state=tk.DISABLED)
+
+    # "Stats" button
+    btn_stats = ttk.Button(button_frame, text="Stats", command=show_stats)
+    btn_stats.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # "Cancel" button (stops loading or processing)
+    btn_cancel = ttk.Button(button_frame, text="Cancel", command=session.cancel, state=tk.DISABLED)
+    btn_cancel.pack(side=tk.LEFT, padx=5, pady=5)
+
+    # Progress indicator
+    progress_bar = ttk.Progressbar(button_frame, length=250, maximum=100)
+    progress_bar.pack(side=tk.LEFT, padx=5, pady=5)
+    status_label = ttk.Label(button_frame, text="")
+    status_label.pack(side=tk.LEFT, padx=5, pady=5)
+
     # "Exit" button
     btn_exit = ttk.Button(button_frame, text="Exit", command=root.destroy)
     btn_exit.pack(side=tk.RIGHT, padx=5, pady=5)
 
+    # Start processing messages from the worker thread
+    poll_messages()
+
+    def on_first_window():
+        """
+        Runs once the window is shown: logs the startup time and starts importing the
+        processing modules in the background.
+        """
+        if start_time is not None:
+            startup_time = time.perf_counter() - start_time
+            if startup_time > settings.STARTUP_TIME_TARGET:
+                logger.warning(f"Time to first window: {startup_time:.2f} s (target {settings.STARTUP_TIME_TARGET} s)")
+            else:
+                logger.info(f"Time to first window: {startup_time:.2f} s")
+        if settings.WARM_UP_IMPORTS:
+            threading.Thread(target=RecordingSession.warm_up, daemon=True).start()
+
+    root.after_idle(on_first_window)
+
     return root
 
 if __name__ == "__main__":
     # Launch the application
-    app = create_gui()
+    app = create_gui(time.perf_counter())
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,105 @@
+# indexer.py
+import argparse
+import csv
+import os
+import sys
+import time
+from config.settings import settings
+from modules.logger import setup_logger
+from modules.segment_index import SegmentIndex, QUERY_COLUMNS
+
+# Logger setup
+logger = setup_logger()
+
+
+def scan(args):
+    """
+    Updates the index with the EDF files of the given directories.
+    """
+    index = SegmentIndex(args.db)
+    workers = args.workers or os.cpu_count() or 1
+    try:
+        for directory in args.directories:
+            start = time.perf_counter()
+            stats = index.scan(directory, workers)
+            for path, error in stats['failed'].items():
+                logger.error(f"Failed to index {path}: {error}")
+            logger.info(
+                f"Indexed {directory}: {stats['read']} files read, {stats['unchanged']} unchanged, "
+                f"{stats['removed']} removed, {len(stats['failed'])} failed ({time.perf_counter() - start:.2f} s)"
+            )
+    finally:
+        index.close()
+    return 0
+
+
+def query(args):
+    """
+    Finds the indexed segments matching the query.
+    """
+    index = SegmentIndex(args.db)
+    try:
+        start = time.perf_counter()
+        rows = index.query(args.from_event, args.to_event, args.min_duration, args.max_duration, args.path)
+        logger.info(f"Query matched {len(rows)} segments ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        output_matches(args, index, rows)
+    finally:
+        index.close()
+    return 0
+
+
+def output_matches(args, index, rows):
+    """
+    Prints (or writes to CSV) the matched segments and optionally exports their samples.
+    """
+    import numpy as np
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(QUERY_COLUMNS)
+            writer.writerows(rows)
+    else:
+        writer = csv.writer(sys.stdout, delimiter='\t')
+        writer.writerow(QUERY_COLUMNS)
+        writer.writerows(rows)
+
+    if args.export:
+        # Only the samples of the matched segments are read
+        os.makedirs(args.export, exist_ok=True)
+        for row, samples in index.load_samples(rows):
+            stem = os.path.splitext(os.path.basename(row[0]))[0]
+            np.save(os.path.join(args.export, f"{stem}_{row[1]}.npy"), samples)
+        logger.info(f"Exported the samples of {len(rows)} segments to {args.export}")
+
+
+def main(argv=None):
+    """
+    Command-line entry point for the segment index.
+    """
+    parser = argparse.ArgumentParser(description="Index the event segments of EDF files and search them across recordings.")
+    parser.add_argument("--db", default=settings.SEGMENT_INDEX_PATH, help="Path to the index database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan_parser = commands.add_parser("scan", help="Index the EDF files of directories (only new or changed files are read).")
+    scan_parser.add_argument("directories", nargs="+", help="Directories to scan (including subdirectories).")
+    scan_parser.add_argument("-j", "--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    scan_parser.set_defaults(func=scan)
+
+    query_parser = commands.add_parser("query", help="Find indexed segments.")
+    query_parser.add_argument("--from", dest="from_event", help="Event the segments start with.")
+    query_parser.add_argument("--to", dest="to_event", help="Event the segments end with ('End' for the last segment).")
+    query_parser.add_argument("--min-duration", type=float, help="Minimum segment duration in seconds.")
+    query_parser.add_argument("--max-duration", type=float, help="Maximum segment duration in seconds.")
+    query_parser.add_argument("--path", help="SQL LIKE pattern the file path must match (e.g. '%%/2024/%%').")
+    query_parser.add_argument("--csv", help="Write the matches to a CSV file instead of printing them.")
+    query_parser.add_argument("--export", metavar="DIR",
+                              help="Also write the samples of each match to DIR/<file>_<segment>.npy.")
+    query_parser.set_defaults(func=query)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
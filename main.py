@@ -1,6 +1,10 @@
 # main.py
+import time
+
+START_TIME = time.perf_counter()  # Measured before the GUI modules are imported
+
 from gui import create_gui
 
 if __name__ == "__main__":
-    app = create_gui()
+    app = create_gui(START_TIME)
     app.mainloop()
\ No newline at end of file
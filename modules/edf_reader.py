@@ -0,0 +1,57 @@
+# modules/edf_reader.py
+import fnmatch
+import mne
+from config.settings import settings
+
+ANNOTATION_CHANNELS = ("EDF Annotations", "BDF Annotations")  # Read by MNE for the annotations, never as data
+
+
+def read_channel_labels(file_path):
+    """
+    Reads the channel labels from the header of an EDF file (as MNE names the channels).
+
+    :param file_path: Path to the EDF file.
+    :return: List of channel labels, in file order.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(252)  # Number of signals, after the fixed part of the header
+        n_signals = int(f.read(4).decode('latin-1').strip())
+        return [f.read(16).strip().decode('latin-1') for _ in range(n_signals)]
+
+
+def excluded_channels(ch_names, include=None, exclude=None):
+    """
+    Returns the channels not selected by include and exclude lists of channel names or
+    glob patterns (e.g. "EEG *", "ECG*").
+
+    :param ch_names: Channel names.
+    :param include: Names or patterns of the channels to read (all channels if empty).
+    :param exclude: Names or patterns of the channels not to read (applied after include).
+    :return: List of the excluded channel names.
+    """
+    def matches(name, patterns):
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+    return [
+        name for name in ch_names
+        if name not in ANNOTATION_CHANNELS
+        and ((include and not matches(name, include)) or (exclude and matches(name, exclude)))
+    ]
+
+
+def open_edf(file_path, include=None, exclude=None, verbose=None):
+    """
+    Opens an EDF file without loading the samples. Channels outside the channel selection
+    are left out when the header is parsed, so their samples are never read or decoded.
+
+    :param file_path: Path to the EDF file.
+    :param include: Names or patterns of the channels to read; settings.CHANNEL_INCLUDE if None.
+    :param exclude: Names or patterns of the channels not to read; settings.CHANNEL_EXCLUDE if None.
+    :param verbose: MNE log level.
+    :return: Tuple of (Raw object, list of the excluded channel names).
+    """
+    include = settings.CHANNEL_INCLUDE if include is None else include
+    exclude = settings.CHANNEL_EXCLUDE if exclude is None else exclude
+    excluded = excluded_channels(read_channel_labels(file_path), include, exclude) if include or exclude else []
+    raw = mne.io.read_raw_edf(file_path, exclude=excluded, preload=False, verbose=verbose)
+    return raw, excluded
@@ -1,11 +1,24 @@
 # modules/event_processor.py
 
 class EventProcessor:
+    @staticmethod
+    def build_event_index(ev_id):
+        """Builds an inverted index mapping event codes to event names."""
+        event_index = {}
+        for name, code in ev_id.items():
+            event_index.setdefault(code, name)  # The first name of a code wins, as in a linear scan
+        return event_index
+
     @staticmethod
     def get_event_name(evt_code, ev_id):
         """Returns the event name based on its code."""
         return next((name for name, code in ev_id.items() if code == evt_code), "Unknown")
 
+    @staticmethod
+    def lookup_event_name(evt_code, event_index):
+        """Returns the event name based on its code, from an index built by build_event_index."""
+        return event_index.get(evt_code, "Unknown")
+
     @staticmethod
     def format_event(time_index, sfreq, event_id_value, event_id):
         """Formats event information."""
@@ -13,11 +26,19 @@ class EventProcessor:
         return f"Time: {time_index / sfreq:.2f} sec., Event ID: {event_id_value}, Description: {evt_name}\n"
 
     @staticmethod
-    def generate_segment_name(base_name, existing_names):
-        """Generates a unique name for a segment."""
+    def generate_segment_name(base_name, existing_names, counters=None):
+        """
+        Generates a unique name for a segment.
+
+        If a counters dictionary is passed, the next suffix for each base name is kept in it,
+        so names already handed out are not probed again (existing_names should then be a set
+        of all names generated so far).
+        """
+        counter = counters.get(base_name, 1) if counters is not None else 1
         seg_name = base_name
-        counter = 1
         while seg_name in existing_names:
             seg_name = f"{base_name}_{counter}"
             counter += 1
-        return seg_name
\ No newline at end of file
+        if counters is not None:
+            counters[base_name] = counter
+        return seg_name
@@ -0,0 +1,3 @@
+# modules/exceptions.py
+class ProcessingCancelled(Exception):
+    """Raised when loading or processing is cancelled by the user."""
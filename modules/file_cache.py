@@ -0,0 +1,62 @@
+# modules/file_cache.py
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    Writes a file atomically: yields a temporary path in the same directory, which
+    replaces the file when the block completes (and is removed if it fails), so
+    concurrent readers never see a partial file.
+
+    :param path: Path of the file to write.
+    :return: Context manager yielding the temporary path to write to.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def evict_lru(cache_dir, max_size, extensions, keep=None):
+    """
+    Removes the least recently used entries of a cache directory until its files fit in
+    max_size. An entry is made of the files sharing a key (the file name without the
+    extension) and was last used when the most recent of them was modified.
+
+    :param cache_dir: Cache directory.
+    :param max_size: Maximum total size of the entry files (in bytes).
+    :param extensions: Extensions of the entry files (e.g. ('.pkl',)).
+    :param keep: Key of an entry that is never removed (e.g. the one just written).
+    """
+    entries = {}
+    for name in os.listdir(cache_dir):
+        key, ext = os.path.splitext(name)
+        if ext in extensions:
+            try:
+                stat = os.stat(os.path.join(cache_dir, name))
+            except OSError:
+                continue
+            mtime, size = entries.get(key, (0, 0))
+            entries[key] = (max(mtime, stat.st_mtime), size + stat.st_size)
+
+    total_size = sum(size for _, size in entries.values())
+    for key, (_, size) in sorted(entries.items(), key=lambda item: item[1][0]):
+        if total_size <= max_size:
+            break
+        if key == keep:
+            continue
+        for ext in extensions:
+            try:
+                os.remove(os.path.join(cache_dir, key + ext))
+            except OSError:
+                continue
+        total_size -= size
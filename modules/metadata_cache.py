@@ -0,0 +1,73 @@
+# modules/metadata_cache.py
+import hashlib
+import os
+import pickle
+from modules.file_cache import atomic_write, evict_lru
+
+CACHE_VERSION = 3  # Increase when the cached entry format or rendered output changes
+
+
+class MetadataCache:
+    """
+    On-disk cache of parsed EDF metadata (events, event identifiers, rendered tables),
+    keyed by file identity (absolute path, size and modification time).
+
+    The total size of the cache is bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        """
+        Initializes the cache.
+
+        :param cache_dir: Directory for the cache files.
+        :param max_size: Maximum total size of the cache files (in bytes).
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @staticmethod
+    def file_key(file_path, *extra):
+        """
+        Returns the cache key of a file.
+
+        :param file_path: Path to the file.
+        :param extra: Additional values the cached data depends on (e.g. settings).
+        :return: Hexadecimal key.
+        """
+        stat = os.stat(file_path)
+        identity = [os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, CACHE_VERSION, *extra]
+        return hashlib.sha1(repr(identity).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Returns a cached entry, or None if there is no entry for the key.
+
+        :param key: Cache key (see file_key).
+        :return: Cached entry or None.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass  # Evicted by another process meanwhile; the entry was read
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores an entry and evicts the least recently used entries if the cache is too large.
+
+        :param key: Cache key (see file_key).
+        :param entry: Picklable entry.
+        """
+        with atomic_write(self._entry_path(key)) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        evict_lru(self.cache_dir, self.max_size, ('.pkl',))
@@ -0,0 +1,87 @@
+# modules/metrics.py
+import json
+import os
+import time
+from contextlib import contextmanager
+from modules.logger import setup_logger
+
+logger = setup_logger()
+
+
+def current_memory():
+    """
+    Returns the resident memory of the process in bytes, or None where it is not available
+    (read from /proc, so only on Linux).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+class StageMetrics:
+    """
+    Collects the duration and memory change of pipeline stages.
+
+    Each stage is logged as it ends, tagged with the current file name, channel count and
+    segment count; summary() returns the stages of the current run as a dictionary.
+    """
+
+    def __init__(self):
+        self.context = {}  # Tags added to every stage (file, channels, segments)
+        self.stages = []  # Recorded stages of the current run
+
+    def start_run(self, **context):
+        """
+        Starts a new run, discarding the recorded stages.
+
+        :param context: Initial tags (e.g. file name).
+        """
+        self.context = dict(context)
+        self.stages = []
+
+    def tag(self, **context):
+        """
+        Adds or updates tags of the current run (e.g. channel or segment count).
+        """
+        self.context.update(context)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the stage run inside the `with` block.
+
+        :param name: Stage name.
+        """
+        memory_before = current_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            memory_after = current_memory()
+            memory_delta = memory_after - memory_before if memory_before is not None and memory_after is not None else None
+            record = dict(stage=name, duration=duration, memory_delta=memory_delta, **self.context)
+            self.stages.append(record)
+            memory_text = f"{memory_delta / 2 ** 20:+.1f} MB" if memory_delta is not None else "n/a"
+            tags = ', '.join(f"{key}={value}" for key, value in self.context.items())
+            logger.info(f"Stage {name}: {duration:.3f} s, memory {memory_text} ({tags})")
+
+    def summary(self):
+        """
+        Returns the recorded stages of the current run.
+
+        :return: Dictionary with the run tags, total duration and the list of stages.
+        """
+        return dict(
+            **self.context,
+            total_duration=sum(record['duration'] for record in self.stages),
+            stages=list(self.stages)
+        )
+
+    def log_summary(self):
+        """
+        Logs the run summary as a single JSON line.
+        """
+        logger.info(f"Run summary: {json.dumps(self.summary(), default=str)}")
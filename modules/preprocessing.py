@@ -0,0 +1,303 @@
+# modules/preprocessing.py
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import mne
+import numpy as np
+from mne.io.constants import FIFF
+from config.settings import settings
+from modules.file_cache import atomic_write, evict_lru
+from modules.metadata_cache import MetadataCache
+from modules.stream_reader import iter_chunks, read_samples
+
+CACHE_VERSION = 2  # Increase when the cached entry format or the processing changes
+
+
+class PreprocessingChain:
+    """
+    Declarative chain of preprocessing steps, applied in order. Each step is a
+    (name, parameters) pair:
+
+    - ("bandpass", {"l_freq": 1.0, "h_freq": 40.0}): FIR band-pass filter (either bound may be None)
+    - ("notch", {"freqs": [50.0, 100.0]}): notch filter at the given frequencies
+    - ("resample", {"sfreq": 125.0}): resampling to a new sampling frequency
+    - ("reference", {"ref_channels": "average"}): re-referencing to the average or to a list of channels
+
+    All steps are linear and the same for every channel, so filtering and resampling are
+    applied to each channel on its own and re-referencing (the only step that combines
+    channels) is applied last, sample by sample.
+    """
+
+    STEPS = ('bandpass', 'notch', 'resample', 'reference')
+
+    def __init__(self, steps):
+        """
+        Initializes the chain.
+
+        :param steps: List of (name, parameters) pairs.
+        """
+        self.steps = [(name, dict(params)) for name, params in steps]
+        for name, _ in self.steps:
+            if name not in self.STEPS:
+                raise ValueError(f"Unknown preprocessing step '{name}' (expected one of {', '.join(self.STEPS)}).")
+
+    def __bool__(self):
+        return bool(self.steps)
+
+    @property
+    def params(self):
+        """
+        Parameters of the chain, as a stable string (used in cache keys).
+        """
+        return repr([(name, sorted(params.items())) for name, params in self.steps])
+
+    def output_sfreq(self, sfreq):
+        """
+        Returns the sampling frequency after the chain.
+        """
+        for name, params in self.steps:
+            if name == 'resample':
+                sfreq = float(params['sfreq'])
+        return sfreq
+
+    def apply_channels(self, data, sfreq):
+        """
+        Applies the filtering and resampling steps to whole channels.
+
+        :param data: Array (n_channels, n_samples) of complete channels; not modified.
+        :param sfreq: Sampling frequency (in Hz).
+        :return: Array (n_channels, n_output_samples).
+        """
+        data = np.asarray(data, dtype=np.float64)
+        for name, params in self.steps:
+            if name != 'reference':
+                data = self._apply_step(name, params, data, sfreq)
+            if name == 'resample':
+                sfreq = float(params['sfreq'])
+        return data
+
+    def apply_reference(self, data, ch_names):
+        """
+        Applies the re-referencing steps to samples of all channels.
+
+        :param data: Array (n_channels, n_samples), any time range of the recording; not modified.
+        :param ch_names: Channel names (for re-referencing to given channels).
+        :return: Array (n_channels, n_samples).
+        """
+        for name, params in self.steps:
+            if name == 'reference':
+                data = self._reference(data, ch_names, **params)
+        return data
+
+    @staticmethod
+    def _apply_step(name, params, data, sfreq):
+        """
+        Applies one per-channel step.
+        """
+        if name == 'bandpass':
+            return mne.filter.filter_data(data, sfreq, params.get('l_freq'), params.get('h_freq'), verbose=False)
+        if name == 'notch':
+            return mne.filter.notch_filter(data, sfreq, params['freqs'], verbose=False)
+        return mne.filter.resample(data, up=float(params['sfreq']), down=sfreq, npad='auto', verbose=False)  # As Raw.resample
+
+    @staticmethod
+    def _reference(data, ch_names, ref_channels='average'):
+        """
+        Subtracts the mean of the reference channels (all channels for 'average').
+        """
+        picks = slice(None) if ref_channels == 'average' else [ch_names.index(name) for name in ref_channels]
+        return data - data[picks].mean(axis=0, keepdims=True)
+
+    def apply_info(self, info):
+        """
+        Returns a copy of a measurement info updated for the chain (filter bounds,
+        sampling frequency, reference), as the corresponding Raw methods update it.
+        """
+        info = info.copy()
+        with info._unlock():
+            for name, params in self.steps:
+                if name == 'bandpass':
+                    if params.get('l_freq') is not None:
+                        info['highpass'] = float(params['l_freq'])
+                    if params.get('h_freq') is not None:
+                        info['lowpass'] = float(params['h_freq'])
+                elif name == 'resample':
+                    info['sfreq'] = float(params['sfreq'])
+                    info['lowpass'] = min(info['lowpass'], info['sfreq'] / 2)
+                elif name == 'reference':
+                    info['custom_ref_applied'] = FIFF.FIFFV_MNE_CUSTOM_REF_ON
+        return info
+
+
+def preprocess_recording(raw, events, chain, output, workers=1, progress=None, buffer=np.empty):
+    """
+    Applies a preprocessing chain to a recording and writes the result to an array.
+
+    Each channel is filtered as one continuous signal, so filters have no edge effects at
+    segment boundaries and the result does not depend on whether the recording is
+    preloaded. A recording that is not in memory is first read in chunks into a buffer;
+    the channels are then processed in blocks of bounded size
+    (settings.PREPROCESSING_BLOCK_MEMORY), split over the workers, and re-referenced in
+    chunks of the output.
+
+    :param raw: Recording.
+    :param events: Events array (sample, previous value, event code).
+    :param chain: PreprocessingChain.
+    :param output: Function called with the output shape, returning the array to write to.
+    :param workers: Number of threads.
+    :param progress: Function called with (steps done, total steps) as chunks are read and
+                     channel blocks processed.
+    :param buffer: Function called with the shape of the recording, returning the array
+                   the samples of a recording that is not preloaded are read into.
+    :return: Tuple of (output array, events at the output sampling frequency).
+    """
+    sfreq = raw.info['sfreq']
+    ratio = chain.output_sfreq(sfreq) / sfreq
+    n_channels = len(raw.ch_names)
+    n_times = int(round(raw.n_times * ratio))
+    data = output((n_channels, n_times))
+
+    events = events.copy()
+    events[:, 0] = np.minimum(np.round(events[:, 0] * ratio).astype(np.int64), n_times - 1)
+
+    # Channels per block: bounded memory per thread, and at least one block per thread
+    block_size = max(1, settings.PREPROCESSING_BLOCK_MEMORY // (8 * max(raw.n_times, n_times)))
+    block_size = min(block_size, -(-n_channels // workers))
+    blocks = [(start, min(start + block_size, n_channels)) for start in range(0, n_channels, block_size)]
+    chunk_size = max(1, settings.PREPROCESSING_BLOCK_MEMORY // (8 * n_channels))
+    n_chunks = 0 if raw.preload else -(-int(raw.n_times) // chunk_size)
+    total = n_chunks + len(blocks)
+
+    if raw.preload:
+        samples = read_samples(raw, 0, raw.n_times)
+    else:
+        samples = buffer((n_channels, raw.n_times))
+        for done, (start, chunk) in enumerate(iter_chunks(raw, chunk_size), 1):
+            samples[:, start:start + chunk.shape[1]] = chunk
+            if progress is not None:
+                progress(done, total)
+
+    def process_block(block):
+        start, stop = block
+        data[start:stop] = _fit(chain.apply_channels(samples[start:stop], sfreq), n_times)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for done, _ in enumerate(executor.map(process_block, blocks), n_chunks + 1):
+            if progress is not None:
+                progress(done, total)
+    finally:
+        executor.shutdown(cancel_futures=True)  # Pending blocks are dropped if progress raised (cancellation)
+
+    if any(name == 'reference' for name, _ in chain.steps):
+        for start in range(0, n_times, chunk_size):
+            data[:, start:start + chunk_size] = chain.apply_reference(data[:, start:start + chunk_size], raw.ch_names)
+    return data, events
+
+
+def _fit(data, n_times):
+    """
+    Trims or zero-pads resampled samples to n_times samples (resampling rounds the length).
+    """
+    if data.shape[1] >= n_times:
+        return data[:, :n_times]
+    return np.pad(data, ((0, 0), (0, n_times - data.shape[1])))
+
+
+class PreprocessedCache:
+    """
+    On-disk cache of preprocessed recordings: the samples (a .npy file, opened as a
+    memory map) and the updated measurement info and events (a .pkl file),
+    keyed by the file identity, the channel selection and the preprocessing chain.
+
+    The total size of the cache is bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir, max_size):
+        """
+        Initializes the cache.
+
+        :param cache_dir: Directory for the cache files.
+        :param max_size: Maximum total size of the cache files (in bytes).
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    @staticmethod
+    def file_key(file_path, chain, *extra):
+        """
+        Returns the cache key of a preprocessed file.
+
+        :param file_path: Path to the EDF file.
+        :param chain: PreprocessingChain.
+        :param extra: Other values the result depends on (e.g. the channel selection).
+        :return: Hexadecimal key.
+        """
+        return MetadataCache.file_key(file_path, 'preprocessed', CACHE_VERSION, chain.params, *extra)
+
+    def get(self, key):
+        """
+        Returns a cached recording, or None if there is no entry for the key.
+
+        :param key: Cache key (see file_key).
+        :return: Tuple of (RawArray over the memory-mapped samples, events) or None.
+        """
+        data_path = os.path.join(self.cache_dir, f"{key}.npy")
+        meta_path = os.path.join(self.cache_dir, f"{key}.pkl")
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = pickle.load(f)
+            data = np.load(data_path, mmap_mode='c')  # Copy on write: the cache file is never changed
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+        try:
+            os.utime(data_path)  # Mark as recently used
+        except OSError:
+            pass  # Evicted by another process meanwhile; the memory map stays valid
+        raw = mne.io.RawArray(data, meta['info'], verbose=False)
+        raw.set_annotations(meta['annotations'])
+        return raw, meta['events']
+
+    def put(self, key, raw, events, chain, workers=1, progress=None):
+        """
+        Preprocesses a recording into the cache and returns the cached result.
+
+        :param key: Cache key (see file_key).
+        :param raw: Recording.
+        :param events: Events array.
+        :param chain: PreprocessingChain.
+        :param workers: Number of threads (see preprocess_recording).
+        :param progress: Progress function (see preprocess_recording).
+        :return: Tuple of (RawArray over the memory-mapped samples, events).
+        """
+        result = None
+        while result is None:
+            # Another process sharing the cache can evict the entry before it is opened
+            self._write(key, raw, events, chain, workers, progress)
+            result = self.get(key)
+        return result
+
+    def _write(self, key, raw, events, chain, workers, progress):
+        """
+        Preprocesses a recording into the cache files of an entry, then evicts the least
+        recently used entries if the cache is too large.
+        """
+        with atomic_write(os.path.join(self.cache_dir, f"{key}.npy")) as tmp_path, \
+                tempfile.TemporaryFile(dir=self.cache_dir) as buffer_file:
+            def output(shape):
+                return np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64, shape=shape)
+
+            def buffer(shape):
+                # Samples of a recording that is not preloaded, read once from the file
+                return np.memmap(buffer_file, dtype=np.float64, mode='w+', shape=shape)
+
+            data, events = preprocess_recording(raw, events, chain, output, workers, progress, buffer)
+            data.flush()
+            del data
+
+        with atomic_write(os.path.join(self.cache_dir, f"{key}.pkl")) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(dict(info=chain.apply_info(raw.info), events=events, annotations=raw.annotations),
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+        evict_lru(self.cache_dir, self.max_size, ('.npy', '.pkl'), keep=key)
@@ -0,0 +1,74 @@
+# modules/segment.py
+import mne
+from modules.stream_reader import read_samples
+
+
+class Segment:
+    """
+    A segment of a recording stored as a sample-index range over the recording's data buffer.
+
+    No sample data is copied when a segment is created; a full Raw object is built only
+    when it is requested through `to_raw()` (or the legacy `segment['data']` key).
+    """
+
+    def __init__(self, raw, start, stop, start_time, end_time, current_event, next_event):
+        """
+        Initializes the segment.
+
+        :param raw: Recording the segment belongs to.
+        :param start: Index of the first sample (relative to the start of the recording).
+        :param stop: Index one past the last sample.
+        :param start_time: Start time of the segment in seconds.
+        :param end_time: End time of the segment in seconds.
+        :param current_event: Name of the event that opens the segment.
+        :param next_event: Name of the event that closes the segment ("End" for the last one).
+        """
+        self.raw = raw
+        self.start = start
+        self.stop = stop
+        self.start_time = start_time
+        self.end_time = end_time
+        self.current_event = current_event
+        self.next_event = next_event
+
+    @property
+    def duration(self):
+        """Returns the duration of the segment in seconds."""
+        return self.end_time - self.start_time
+
+    @property
+    def samples(self):
+        """
+        Returns the segment samples.
+
+        For a preloaded recording this is a view over its data buffer; otherwise only
+        the samples of this segment are read from disk.
+        """
+        return read_samples(self.raw, self.start, self.stop)
+
+    def to_raw(self):
+        """
+        Builds a Raw object for the segment.
+
+        Only the samples of this segment are copied (or read from disk), so the result
+        can be modified without affecting the recording or other segments.
+
+        :return: RawArray with the segment data, annotations and montage.
+        """
+        seg_raw = mne.io.RawArray(
+            self.samples,
+            self.raw.info,
+            first_samp=self.raw.first_samp + self.start,
+            copy="both" if self.raw.preload else "info",
+            verbose=False
+        )
+        seg_raw.set_annotations(self.raw.annotations, emit_warning=False)
+        return seg_raw
+
+    def __getitem__(self, key):
+        """Provides dictionary-style access to the segment fields."""
+        if key == 'data':
+            return self.to_raw()
+        if key in ('start_time', 'end_time', 'current_event', 'next_event'):
+            return getattr(self, key)
+        raise KeyError(key)
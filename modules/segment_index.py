@@ -0,0 +1,283 @@
+# modules/segment_index.py
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import settings
+
+INDEX_VERSION = 3  # Increase when the schema or the computed segments change
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    channels TEXT NOT NULL,
+    sfreq REAL NOT NULL,
+    n_channels INTEGER NOT NULL,
+    n_times INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_ids (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    code INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    duration REAL NOT NULL,
+    from_event TEXT NOT NULL,
+    to_event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS event_ids_file ON event_ids (file_id);
+CREATE INDEX IF NOT EXISTS segments_file ON segments (file_id);
+CREATE INDEX IF NOT EXISTS segments_events ON segments (from_event, to_event, duration);
+CREATE INDEX IF NOT EXISTS segments_duration ON segments (duration);
+"""
+
+# Columns of the rows returned by SegmentIndex.query
+QUERY_COLUMNS = ["File", "Segment", "Start (sample)", "Stop (sample)", "Start Time (sec)", "End Time (sec)",
+                 "Duration (sec)", "From Event", "To Event"]
+
+
+def read_segments(file_path, include, exclude):
+    """
+    Reads the header and annotations of an EDF file (no samples) and computes all
+    event-to-event segments, as EDFProcessor.process does before filtering (segments
+    keep these names after filtering, so they match the processor's outputs).
+    Runs in a worker process when scanning in parallel.
+
+    :param file_path: Path to the EDF file.
+    :param include: Names or patterns of the channels to read (see open_edf).
+    :param exclude: Names or patterns of the channels not to read (see open_edf).
+    :return: Dictionary with the file information, event identifiers and segment rows.
+    """
+    import mne
+    from modules.edf_reader import open_edf
+    from modules.segment_table import SegmentTable
+
+    raw, _ = open_edf(file_path, include, exclude, verbose=False)
+    events, event_id = mne.events_from_annotations(raw, verbose=False)
+    if len(events) >= 2:  # As EDFProcessor.process: no segments with fewer than two events
+        table = SegmentTable.from_events(raw, events, event_id)
+        records = table.records
+        segments = list(zip(
+            table.names, records['start'].tolist(), records['stop'].tolist(),
+            records['start_time'].tolist(), records['end_time'].tolist(), records['duration'].tolist(),
+            table.event_names('from_code'), table.event_names('to_code')
+        ))
+    else:
+        segments = []
+    return dict(
+        sfreq=raw.info['sfreq'],
+        n_channels=len(raw.ch_names),
+        n_times=raw.n_times,
+        event_id={str(name): int(code) for name, code in event_id.items()},
+        segments=[(str(name), start, stop, t0, t1, d, str(a), str(b)) for name, start, stop, t0, t1, d, a, b in segments]
+    )
+
+
+class SegmentIndex:
+    """
+    SQLite index of the event segments of many EDF files, so segments can be searched
+    across an archive without opening the files.
+
+    Scans are incremental: a file is read again only if its size, modification time or
+    channel selection changed, and files that no longer exist are removed from the index.
+    Each file's channel selection is stored with it and used when its samples are loaded.
+    """
+
+    def __init__(self, db_path, include=None, exclude=None):
+        """
+        Opens (or creates) the index.
+
+        :param db_path: Path to the SQLite database file.
+        :param include: Names or patterns of the channels to index files with;
+                        settings.CHANNEL_INCLUDE if None.
+        :param exclude: Names or patterns of the channels not to read;
+                        settings.CHANNEL_EXCLUDE if None.
+        """
+        self.include = list(settings.CHANNEL_INCLUDE if include is None else include)
+        self.exclude = list(settings.CHANNEL_EXCLUDE if exclude is None else exclude)
+        self.channels = json.dumps(dict(include=self.include, exclude=self.exclude))  # Selection stored per file
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            # Rebuild an index written by another version
+            self.connection.executescript("DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS event_ids; "
+                                          "DROP TABLE IF EXISTS files;")
+            self.connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
+
+    def scan(self, directory, workers=1, progress=None):
+        """
+        Updates the index with the EDF files in a directory (including subdirectories).
+
+        :param directory: Directory to scan.
+        :param workers: Number of worker processes reading the files.
+        :param progress: Function called with (files done, files to read) after each file.
+        :return: Dictionary with the number of files read, unchanged, removed and failed.
+        """
+        paths = sorted(
+            os.path.abspath(os.path.join(root, name))
+            for root, _, names in os.walk(directory)
+            for name in names if name.lower().endswith('.edf')
+        )
+
+        # Files that disappeared from the directory
+        prefix = os.path.join(os.path.abspath(directory), '')
+        existing = set(paths)
+        removed = [
+            path for (path,) in self.connection.execute(
+                "SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+            if path not in existing
+        ]
+        with self.connection:
+            self.connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+
+        stats = self.update(paths, workers, progress)
+        stats['removed'] = len(removed)
+        return stats
+
+    def update(self, paths, workers=1, progress=None):
+        """
+        Indexes the given files, skipping those that did not change (and were indexed with
+        the same channel selection) since they were indexed.
+
+        :param paths: EDF file paths.
+        :param workers: Number of worker processes reading the files.
+        :param progress: Function called with (files done, files to read) after each file.
+        :return: Dictionary with the number of files read, unchanged and failed.
+        """
+        indexed = {path: (size, mtime_ns, channels) for path, size, mtime_ns, channels in
+                   self.connection.execute("SELECT path, size, mtime_ns, channels FROM files")}
+        changed = []
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            if indexed.get(path) != (stat.st_size, stat.st_mtime_ns, self.channels):
+                changed.append((path, stat))
+
+        failed = {}
+        if workers > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(changed))) as executor:
+                futures = [(path, stat, executor.submit(read_segments, path, self.include, self.exclude)) for path, stat in changed]
+                results = ((path, stat, future.result) for path, stat, future in futures)
+                failed = self._store_all(results, len(changed), progress)
+        else:
+            results = ((path, stat, lambda path=path: read_segments(path, self.include, self.exclude)) for path, stat in changed)
+            failed = self._store_all(results, len(changed), progress)
+
+        return dict(read=len(changed) - len(failed), unchanged=len(paths) - len(changed), failed=failed)
+
+    def _store_all(self, results, total, progress):
+        """
+        Stores the segments of read files, one transaction per file.
+
+        :param results: Iterable of (path, stat, function returning read_segments' result).
+        :param total: Number of files.
+        :param progress: Progress function (see update).
+        :return: Dictionary of failed files and errors.
+        """
+        failed = {}
+        for done, (path, stat, get_result) in enumerate(results, 1):
+            try:
+                self._store(path, stat, get_result())
+            except Exception as e:
+                failed[path] = str(e)
+            if progress is not None:
+                progress(done, total)
+        return failed
+
+    def _store(self, path, stat, info):
+        """
+        Replaces the index entries of one file.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, size, mtime_ns, channels, sfreq, n_channels, n_times, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, self.channels, info['sfreq'], info['n_channels'], info['n_times'], time.time())
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO event_ids (file_id, name, code) VALUES (?, ?, ?)",
+                [(file_id, name, code) for name, code in info['event_id'].items()]
+            )
+            self.connection.executemany(
+                "INSERT INTO segments (file_id, name, start, stop, start_time, end_time, duration, from_event, to_event) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(file_id, *segment) for segment in info['segments']]
+            )
+
+    def query(self, from_event=None, to_event=None, min_duration=None, max_duration=None, path_pattern=None):
+        """
+        Finds segments across all indexed files.
+
+        :param from_event: Name of the event the segments start with (any if None).
+        :param to_event: Name of the event the segments end with (any if None; "End" for
+                         the last segment of a recording).
+        :param min_duration: Minimum duration (in seconds).
+        :param max_duration: Maximum duration (in seconds).
+        :param path_pattern: SQL LIKE pattern the file path must match (e.g. '%/2024/%').
+        :return: List of rows with the QUERY_COLUMNS values, ordered by file and time.
+        """
+        conditions, params = [], []
+        for condition, value in (("s.from_event = ?", from_event), ("s.to_event = ?", to_event),
+                                 ("s.duration >= ?", min_duration), ("s.duration <= ?", max_duration),
+                                 ("f.path LIKE ?", path_pattern)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        sql = ("SELECT f.path, s.name, s.start, s.stop, s.start_time, s.end_time, s.duration, s.from_event, s.to_event "
+               "FROM segments s JOIN files f ON f.id = s.file_id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY f.path, s.start"
+        return self.connection.execute(sql, params).fetchall()
+
+    def event_id(self, path):
+        """
+        Returns the event identifiers of an indexed file.
+
+        :param path: File path.
+        :return: Dictionary of event name -> code.
+        """
+        return dict(self.connection.execute(
+            "SELECT e.name, e.code FROM event_ids e JOIN files f ON f.id = e.file_id WHERE f.path = ?",
+            (os.path.abspath(path),)
+        ))
+
+    def load_samples(self, rows):
+        """
+        Reads the samples of query rows, opening each file once and reading only the
+        samples of the matched segments, of the channels the file was indexed with.
+
+        :param rows: Rows returned by query.
+        :return: Generator of (row, samples (n_channels, n_samples)) pairs, in the order of the rows.
+        """
+        from modules.edf_reader import open_edf
+
+        raw, raw_path = None, None
+        for row in rows:
+            path, start, stop = row[0], row[2], row[3]
+            if path != raw_path:
+                (channels,) = self.connection.execute("SELECT channels FROM files WHERE path = ?", (path,)).fetchone()
+                channels = json.loads(channels)
+                (raw, _), raw_path = open_edf(path, channels['include'], channels['exclude'], verbose=False), path
+            yield row, raw.get_data(start=start, stop=stop)
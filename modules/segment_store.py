@@ -0,0 +1,194 @@
+# modules/segment_store.py
+import json
+import os
+import numpy as np
+from modules.stream_reader import stream_segments
+
+STORE_VERSION = 1
+SAMPLES_FILE = "samples.bin"  # Contiguous sample blocks, one (n_channels, n_samples) block per segment
+INDEX_FILE = "index.npy"  # One row per segment: name, times, events, block offset and length
+SCALES_FILE = "scales.npy"  # Per-segment, per-channel scale factors (int16 stores only)
+META_FILE = "meta.json"  # Channel names, sampling frequency, sample type
+
+
+class SegmentStore:
+    """
+    Compact on-disk store of the segments of one recording.
+
+    Samples are kept in a single memory-mapped file, so any segment can be read
+    without reading the others or the original EDF file. Stores are written by streaming
+    the recording, so recordings larger than memory can be exported.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a segment store for reading.
+
+        :param path: Directory of the store.
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.ch_names = self.meta['ch_names']
+        self.sfreq = self.meta['sfreq']
+        self.dtype = np.dtype(self.meta['dtype'])
+        self.index = np.load(os.path.join(path, INDEX_FILE), mmap_mode='r')
+        self.scales = np.load(os.path.join(path, SCALES_FILE)) if self.dtype == np.int16 else None
+        samples_path = os.path.join(path, SAMPLES_FILE)
+        if os.path.getsize(samples_path):
+            self.samples = np.memmap(samples_path, dtype=self.dtype, mode='r')
+        else:
+            self.samples = np.empty(0, dtype=self.dtype)
+        self._positions = None  # Segment name -> row, built on the first lookup by name
+
+    @staticmethod
+    def write(path, segments, dtype='float32', progress=None, chunk_size=None):
+        """
+        Writes segments to a new store, streaming the recording in chunks.
+
+        :param path: Directory of the store (created if needed).
+        :param segments: SegmentTable with the segments to write.
+        :param dtype: Sample type: 'float32', or 'int16' (scaled per segment and channel;
+                      the recording is streamed twice, first to find the scales).
+        :param progress: Function called with (done, total) after each segment (optional).
+        :param chunk_size: Maximum number of samples read at once (one minute of data if None).
+        :return: Number of bytes of sample data written.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float32, np.int16):
+            raise ValueError(f"Unsupported sample type: {dtype}")
+
+        raw = segments.raw
+        n_channels = len(raw.ch_names)
+        if chunk_size is None:
+            chunk_size = int(60 * raw.info['sfreq'])
+        names = list(segments.names)
+        from_events = segments.event_names('from_code')
+        to_events = segments.event_names('to_code')
+        records = segments.records
+        text_len = max([1] + [len(s) for s in names + from_events + to_events])
+        index = np.empty(len(names), dtype=[
+            ('name', f'U{text_len}'),
+            ('start_time', np.float64),
+            ('end_time', np.float64),
+            ('from_event', f'U{text_len}'),
+            ('to_event', f'U{text_len}'),
+            ('offset', np.int64),  # Offset of the block in samples.bin (in elements)
+            ('n_samples', np.int64)
+        ])
+        index['name'] = names
+        index['start_time'] = records['start_time']
+        index['end_time'] = records['end_time']
+        index['from_event'] = from_events
+        index['to_event'] = to_events
+        index['n_samples'] = records['stop'] - records['start']
+        block_sizes = index['n_samples'] * n_channels
+        index['offset'] = np.cumsum(block_sizes) - block_sizes
+        offsets, lengths = index['offset'].tolist(), index['n_samples'].tolist()
+
+        # Scale factors for int16 samples (peak absolute value of each segment channel -> 32767)
+        scales = np.ones((len(names), n_channels), dtype=np.float32)
+        if dtype == np.int16:
+            peaks = np.zeros((len(names), n_channels))
+            for row, _, piece in stream_segments(segments, chunk_size):
+                np.maximum(peaks[row], np.abs(piece).max(axis=1), out=peaks[row])
+            scales[:] = np.where(peaks > 0, peaks / np.iinfo(np.int16).max, 1.0)
+
+        os.makedirs(path, exist_ok=True)
+        samples_path = os.path.join(path, SAMPLES_FILE)
+        total_size = int(block_sizes.sum())
+        if total_size:
+            samples = np.memmap(samples_path, dtype=dtype, mode='w+', shape=(total_size,))
+            done = 0
+            for row, offset, piece in stream_segments(segments, chunk_size):
+                block = samples[offsets[row]:offsets[row] + n_channels * lengths[row]].reshape(n_channels, lengths[row])
+                if dtype == np.int16:
+                    piece = np.round(piece / scales[row][:, None])
+                block[:, offset:offset + piece.shape[1]] = piece
+                if offset + piece.shape[1] == lengths[row]:
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(names))
+            samples.flush()
+            del samples
+        else:
+            open(samples_path, 'wb').close()
+
+        np.save(os.path.join(path, INDEX_FILE), index)
+        if dtype == np.int16:
+            np.save(os.path.join(path, SCALES_FILE), scales)
+        meta = dict(
+            version=STORE_VERSION,
+            source=getattr(raw, 'filenames', [None])[0],
+            ch_names=list(raw.ch_names),
+            sfreq=raw.info['sfreq'],
+            dtype=dtype.name,
+            n_segments=len(names)
+        )
+        with open(os.path.join(path, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, default=str)
+        return int(index['n_samples'].sum()) * n_channels * dtype.itemsize
+
+    def position(self, key):
+        """
+        Returns the row of a segment in the index.
+
+        :param key: Segment name or row number.
+        :return: Row number.
+        """
+        if not isinstance(key, str):
+            return int(key)
+        if self._positions is None:
+            self._positions = {name: i for i, name in enumerate(self.index['name'].tolist())}
+        return self._positions[key]
+
+    def get_samples(self, key):
+        """
+        Returns the samples of one segment.
+
+        :param key: Segment name or row number.
+        :return: Array (n_channels, n_samples); a read-only view into the store for
+                 float32 stores, or the dequantized float32 samples for int16 stores.
+        """
+        i = self.position(key)
+        rec = self.index[i]
+        offset, n_samples = int(rec['offset']), int(rec['n_samples'])
+        block = self.samples[offset:offset + len(self.ch_names) * n_samples].reshape(len(self.ch_names), n_samples)
+        if self.scales is not None:
+            return block * self.scales[i][:, None]
+        return block
+
+    def to_raw(self, key):
+        """
+        Builds a Raw object for one segment.
+
+        :param key: Segment name or row number.
+        :return: RawArray with the segment samples.
+        """
+        import mne
+
+        info = mne.create_info(self.ch_names, self.sfreq, ch_types='eeg')
+        return mne.io.RawArray(np.asarray(self.get_samples(key), dtype=np.float64), info, verbose=False)
+
+    def rows(self, start=0, stop=None):
+        """
+        Returns index rows as formatted values (same columns as the segment table).
+
+        :param start: First row.
+        :param stop: Row after the last one (end of the index if None).
+        :return: List of [name, start, end, from event, to event, duration] rows.
+        """
+        index = self.index[start:stop]
+        return [
+            [name, f"{start_time:.3f}", f"{end_time:.3f}", from_name, to_name, f"{end_time - start_time:.3f}"]
+            for name, start_time, end_time, from_name, to_name in zip(
+                index['name'].tolist(),
+                index['start_time'].tolist(),
+                index['end_time'].tolist(),
+                index['from_event'].tolist(),
+                index['to_event'].tolist()
+            )
+        ]
+
+    def __len__(self):
+        return len(self.index)
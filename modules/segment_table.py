@@ -0,0 +1,189 @@
+# modules/segment_table.py
+from collections.abc import Mapping
+import numpy as np
+from modules.event_processor import EventProcessor
+from modules.segment import Segment
+
+END_CODE = -1  # Event code used for the end of the recording
+
+# Columns of the segment table
+SEGMENT_DTYPE = np.dtype([
+    ('start', np.int64),  # Index of the first sample
+    ('stop', np.int64),  # Index one past the last sample
+    ('start_time', np.float64),  # Start time (sec)
+    ('end_time', np.float64),  # End time (sec)
+    ('duration', np.float64),  # Duration (sec)
+    ('from_code', np.int64),  # Code of the event that opens the segment
+    ('to_code', np.int64)  # Code of the event that closes the segment (END_CODE for the last one)
+])
+
+
+class SegmentTable(Mapping):
+    """
+    Columnar table of segments stored in a NumPy structured array.
+
+    Behaves as a read-only mapping from segment name to Segment, so it can be used
+    in place of the former dictionary of segments; Segment objects are created on access.
+    """
+
+    def __init__(self, raw, records, code_names, names=None):
+        """
+        Initializes the segment table.
+
+        :param raw: Recording the segments belong to.
+        :param records: Structured array with SEGMENT_DTYPE rows.
+        :param code_names: Dictionary mapping event codes (and END_CODE) to event names.
+        :param names: Segment names, one per row (generated in table order if None).
+        """
+        self.raw = raw
+        self.records = records
+        self.code_names = code_names
+
+        if names is None:
+            # Generate unique segment names in table order
+            names = []
+            used_names = set()
+            name_counters = {}
+            for code in records['from_code'].tolist():
+                seg_name = EventProcessor.generate_segment_name(code_names[code], used_names, name_counters)
+                used_names.add(seg_name)
+                names.append(seg_name)
+        self.names = names
+        self._index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_events(cls, raw, events, event_id):
+        """
+        Builds the table of all event-to-event segments in one pass over the events array.
+
+        Each event opens a segment that ends at the next event; the last one ends
+        at the end of the recording.
+
+        :param raw: Recording the events belong to.
+        :param events: Events array (sample, previous value, event code).
+        :param event_id: Event identifiers.
+        :return: SegmentTable with one row per event.
+        """
+        sfreq = raw.info['sfreq']
+        onsets = events[:, 0]
+        codes = events[:, 2]
+
+        records = np.empty(len(events), dtype=SEGMENT_DTYPE)
+        records['start_time'] = onsets / sfreq
+        records['end_time'][:-1] = onsets[1:] / sfreq
+        records['end_time'][-1:] = raw.times[-1]
+        records['duration'] = records['end_time'] - records['start_time']
+
+        # Sample ranges (the end sample is included, as in crop)
+        records['start'] = onsets - raw.first_samp
+        records['stop'][:-1] = onsets[1:] - raw.first_samp + 1
+        records['stop'][-1:] = raw.n_times
+        np.minimum(records['stop'], raw.n_times, out=records['stop'])
+
+        records['from_code'] = codes
+        records['to_code'][:-1] = codes[1:]
+        records['to_code'][-1:] = END_CODE
+
+        event_index = EventProcessor.build_event_index(event_id)
+        code_names = {code: EventProcessor.lookup_event_name(code, event_index) for code in np.unique(codes).tolist()}
+        code_names[END_CODE] = "End"
+        return cls(raw, records, code_names)
+
+    def filter(self, mask):
+        """
+        Returns a table with the rows selected by a boolean mask.
+
+        :param mask: Boolean array with one value per row.
+        :return: New SegmentTable. The selected segments keep their names, so a segment has
+                 the same name whatever the filters (names are given once by from_events).
+        """
+        names = [self.names[i] for i in np.flatnonzero(mask).tolist()]
+        return SegmentTable(self.raw, self.records[mask], self.code_names, names)
+
+    def min_duration(self, min_duration):
+        """
+        Returns a table with the segments that last at least the given time.
+
+        :param min_duration: Minimum segment duration (in seconds).
+        :return: New SegmentTable.
+        """
+        return self.filter(self.records['duration'] >= min_duration)
+
+    def event_mask(self, column, names):
+        """
+        Returns a mask of the rows whose event is one of the given event names.
+
+        :param column: 'from_code' or 'to_code'.
+        :param names: Event names to select.
+        :return: Boolean array with one value per row.
+        """
+        codes = [code for code, name in self.code_names.items() if name in names]
+        return np.isin(self.records[column], codes)
+
+    def event_types(self, column):
+        """
+        Returns the names of the events occurring in a code column.
+
+        :param column: 'from_code' or 'to_code'.
+        :return: Sorted list of event names.
+        """
+        return sorted({self.code_names[code] for code in np.unique(self.records[column]).tolist()})
+
+    def event_names(self, column, start=0, stop=None):
+        """
+        Returns the event names for a code column.
+
+        :param column: 'from_code' or 'to_code'.
+        :param start: First row.
+        :param stop: Row after the last one (end of the table if None).
+        :return: List of event names.
+        """
+        return [self.code_names[code] for code in self.records[column][start:stop].tolist()]
+
+    def rows(self, start=0, stop=None):
+        """
+        Returns table rows as formatted values.
+
+        :param start: First row.
+        :param stop: Row after the last one (end of the table if None).
+        :return: List of [name, start, end, from event, to event, duration] rows.
+        """
+        records = self.records[start:stop]
+        return [
+            [name, f"{start_time:.3f}", f"{end_time:.3f}", from_name, to_name, f"{duration:.3f}"]
+            for name, start_time, end_time, from_name, to_name, duration in zip(
+                self.names[start:stop],
+                records['start_time'].tolist(),
+                records['end_time'].tolist(),
+                self.event_names('from_code', start, stop),
+                self.event_names('to_code', start, stop),
+                records['duration'].tolist()
+            )
+        ]
+
+    def segment(self, i):
+        """
+        Returns the segment in a given row.
+
+        :param i: Row index.
+        :return: Segment object.
+        """
+        rec = self.records[i]
+        return Segment(
+            self.raw,
+            start=int(rec['start']),
+            stop=int(rec['stop']),
+            start_time=float(rec['start_time']),
+            end_time=float(rec['end_time']),
+            current_event=self.code_names[int(rec['from_code'])],
+            next_event=self.code_names[int(rec['to_code'])]
+        )
+
+    def __getitem__(self, name):
+        return self.segment(self._index[name])
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
@@ -0,0 +1,139 @@
+# modules/segment_windows.py
+import numpy as np
+from modules.stream_reader import read_samples
+
+# Columns of the window index
+WINDOW_DTYPE = np.dtype([
+    ('segment', np.int64),  # Row of the segment in the segment table
+    ('start', np.int64),  # Index of the first sample (relative to the start of the recording)
+    ('start_time', np.float64),  # Start time (sec)
+    ('end_time', np.float64)  # End time (sec)
+])
+
+
+class SegmentWindows:
+    """
+    Fixed-length, possibly overlapping windows inside the segments of a segment table.
+
+    Windows are not copied: for a preloaded recording the windows of a segment are a
+    strided view (n_windows, n_channels, n_samples) over the recording's data buffer.
+    A window never crosses a segment boundary; the remainder at the end of a segment
+    (shorter than one window) is skipped.
+    """
+
+    def __init__(self, segments, duration, overlap=0.0):
+        """
+        Initializes the windows.
+
+        :param segments: SegmentTable.
+        :param duration: Window length (in seconds).
+        :param overlap: Overlap of consecutive windows (fraction of the window, 0 <= overlap < 1).
+        """
+        if duration <= 0 or not 0 <= overlap < 1:
+            raise ValueError("Window duration must be positive and overlap in [0, 1).")
+        self.segments = segments
+        self.sfreq = segments.raw.info['sfreq']
+        self.length = int(round(duration * self.sfreq))  # Window length (in samples)
+        self.step = max(1, self.length - int(round(self.length * overlap)))  # Distance between window starts
+
+        lengths = segments.records['stop'] - segments.records['start']
+        self.counts = np.where(lengths >= self.length, (lengths - self.length) // self.step + 1, 0)  # Windows per segment
+        self.offsets = np.cumsum(self.counts) - self.counts  # Index of the first window of each segment
+        self._index = None
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    @property
+    def index(self):
+        """
+        Structured array with one WINDOW_DTYPE row per window, in segment order
+        (built on first access).
+        """
+        if self._index is None:
+            rows = np.repeat(np.arange(len(self.counts)), self.counts)
+            index = np.empty(len(rows), dtype=WINDOW_DTYPE)
+            index['segment'] = rows
+            index['start'] = self.segments.records['start'][rows] + (np.arange(len(rows)) - self.offsets[rows]) * self.step
+            index['start_time'] = self.segments.records['start_time'][rows] + (index['start'] - self.segments.records['start'][rows]) / self.sfreq
+            index['end_time'] = index['start_time'] + self.length / self.sfreq
+            self._index = index
+        return self._index
+
+    def segment_windows(self, row):
+        """
+        Returns the windows of one segment.
+
+        :param row: Row of the segment in the segment table.
+        :return: Array (n_windows, n_channels, n_samples): a strided view over the data
+                 buffer of a preloaded recording, otherwise over the segment read from disk.
+        """
+        start = int(self.segments.records['start'][row])
+        n_windows = int(self.counts[row])
+        stop = start + (n_windows - 1) * self.step + self.length if n_windows else start
+        samples = read_samples(self.segments.raw, start, stop)
+        return self._as_windows(samples)
+
+    def _as_windows(self, samples):
+        """
+        Returns the windows of a sample range starting at a window start, as a strided view.
+        """
+        n_channels, n_samples = samples.shape
+        n_windows = (n_samples - self.length) // self.step + 1 if n_samples >= self.length else 0
+        return np.lib.stride_tricks.as_strided(
+            samples,
+            shape=(n_windows, n_channels, self.length),
+            strides=(samples.strides[1] * self.step, samples.strides[0], samples.strides[1]),
+            writeable=False
+        )
+
+    def iter_batches(self, batch_size, read_size=None):
+        """
+        Streams the windows in batches of at most batch_size windows. A batch never spans
+        two segments, so every batch is a view without copied samples.
+
+        :param batch_size: Maximum number of windows per batch.
+        :param read_size: If the recording is not preloaded, neighbouring segments are read
+                          from disk together in ranges of up to this many samples (a longer
+                          segment is read alone); each segment is read separately if None.
+        :return: Generator of (index rows, windows) pairs: the WINDOW_DTYPE rows of the
+                 batch and an array (n_windows, n_channels, n_samples).
+        """
+        index = self.index
+        for rows, span_start, samples in self._iter_reads(read_size):
+            for row in rows:
+                start = int(self.segments.records['start'][row]) - span_start
+                n_windows = int(self.counts[row])
+                windows = self._as_windows(samples[:, start:start + (n_windows - 1) * self.step + self.length])
+                first = int(self.offsets[row])
+                for batch_start in range(0, n_windows, batch_size):
+                    batch = windows[batch_start:batch_start + batch_size]
+                    yield index[first + batch_start:first + batch_start + len(batch)], batch
+
+    def _iter_reads(self, read_size):
+        """
+        Groups the segments with windows into sample ranges and reads each range once.
+
+        :return: Generator of (segment rows, range start, samples) tuples.
+        """
+        records = self.segments.records
+        raw = self.segments.raw
+        rows = np.flatnonzero(self.counts).tolist()
+        if raw.preload or read_size is None:
+            for row in rows:
+                start = int(records['start'][row])
+                yield [row], start, read_samples(raw, start, int(records['stop'][row]))
+            return
+
+        group, group_start, group_stop = [], 0, 0
+        for row in rows:
+            start, stop = int(records['start'][row]), int(records['stop'][row])
+            if group and max(group_stop, stop) - group_start > read_size:
+                yield group, group_start, read_samples(raw, group_start, group_stop)
+                group = []
+            if not group:
+                group_start, group_stop = start, stop
+            group.append(row)
+            group_stop = max(group_stop, stop)
+        if group:
+            yield group, group_start, read_samples(raw, group_start, group_stop)
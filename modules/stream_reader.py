@@ -0,0 +1,62 @@
+# modules/stream_reader.py
+import numpy as np
+
+
+def read_samples(raw, start, stop):
+    """
+    Returns the samples of a recording between two sample indices.
+
+    :param raw: Recording (preloaded or not).
+    :param start: Index of the first sample.
+    :param stop: Index one past the last sample.
+    :return: Array (n_channels, stop - start): a view over the data buffer of a preloaded
+             recording, otherwise read from disk.
+    """
+    if raw.preload:
+        return raw._data[:, start:stop]
+    return raw.get_data(start=start, stop=stop)
+
+
+def iter_chunks(raw, chunk_size, start=0, stop=None):
+    """
+    Iterates over the samples of a recording in chunks of bounded size.
+
+    :param raw: Recording (preloaded or not).
+    :param chunk_size: Maximum number of samples per chunk.
+    :param start: Index of the first sample.
+    :param stop: Index one past the last sample (end of the recording if None).
+    :return: Generator of (chunk start, samples) pairs; for a preloaded recording the
+             samples are views over its data buffer, otherwise they are read from disk.
+    """
+    stop = raw.n_times if stop is None else stop
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        yield chunk_start, read_samples(raw, chunk_start, chunk_stop)
+
+
+def stream_segments(segments, chunk_size):
+    """
+    Reads the recording once, in chunks of bounded size, and emits the samples of each
+    segment piece by piece as the stream passes the segment boundaries. Memory use
+    depends on the chunk size, not on the size of the recording or of the segments.
+
+    :param segments: SegmentTable (rows in time order, as built from the events).
+    :param chunk_size: Maximum number of samples read at once.
+    :return: Generator of (row, offset, samples) tuples: the samples (n_channels, n)
+             of segment `row` starting at `offset` samples from the segment start.
+             Pieces of a segment are emitted in order.
+    """
+    records = segments.records
+    if not len(records):
+        return
+    starts, stops = records['start'], records['stop']
+    for chunk_start, chunk in iter_chunks(segments.raw, chunk_size, int(starts.min()), int(stops.max())):
+        chunk_stop = chunk_start + chunk.shape[1]
+        # Rows of the segments overlapping the chunk
+        first_row = np.searchsorted(stops, chunk_start, side='right')
+        last_row = np.searchsorted(starts, chunk_stop, side='left')
+        for row in range(first_row, last_row):
+            seg_start, seg_stop = int(starts[row]), int(stops[row])
+            piece_start, piece_stop = max(seg_start, chunk_start), min(seg_stop, chunk_stop)
+            if piece_start < piece_stop:
+                yield row, piece_start - seg_start, chunk[:, piece_start - chunk_start:piece_stop - chunk_start]
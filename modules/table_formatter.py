@@ -4,6 +4,33 @@ from tabulate import tabulate
 from config.settings import settings
 from modules.event_processor import EventProcessor
 
+SEGMENT_HEADERS = ["Segment", "Start", "End", "From", "To", "Duration"]  # Columns of segment tables
+
+class PagedTable:
+    """
+    A table whose rows are produced and formatted on demand, one page at a time,
+    so that only the rows being displayed are formatted.
+    """
+
+    def __init__(self, headers, n_rows, get_rows):
+        """
+        :param headers: Column headers.
+        :param n_rows: Number of rows.
+        :param get_rows: Function (start, stop) returning the rows in that range.
+        """
+        self.headers = headers
+        self.n_rows = n_rows
+        self.get_rows = get_rows
+
+    def format_page(self, start, stop):
+        """Formats the rows in [start, stop) as a table."""
+        return TableFormatter.format_table(self.get_rows(start, stop), self.headers)
+
+    def format_all(self):
+        """Formats all rows as a single table."""
+        return self.format_page(0, self.n_rows)
+
+
 class TableFormatter:
     @staticmethod
     def format_table(data, headers):
@@ -47,19 +74,47 @@ class TableFormatter:
         return TableFormatter.format_table(data, headers)
 
     @staticmethod
-    def format_event_info(events, sfreq, event_id):
-        """Formats event information."""
+    def format_event_rows(events, sfreq, event_index, start, stop):
+        """Formats the event information of events[start:stop] as table rows."""
         table_data = []
-        for s_idx in range(len(events)):
-            time_index = events[s_idx, 0]
-            event_id_value = events[s_idx, 2]
-            evt_name = EventProcessor.get_event_name(event_id_value, event_id)
+        for time_index, event_id_value in zip(events[start:stop, 0].tolist(), events[start:stop, 2].tolist()):
+            evt_name = EventProcessor.lookup_event_name(event_id_value, event_index)
             time_seconds = time_index / sfreq
             table_data.append([
                 f"{time_seconds:.2f}",
                 event_id_value,
                 evt_name
             ])
+        return table_data
 
+    @staticmethod
+    def event_table(events, sfreq, event_id):
+        """Returns the event information as a paged table."""
+        event_index = EventProcessor.build_event_index(event_id)
         headers = ["Time (sec)", "Event ID", "Description"]
-        return TableFormatter.format_table(table_data, headers)
\ No newline at end of file
+        return PagedTable(
+            headers,
+            len(events),
+            lambda start, stop: TableFormatter.format_event_rows(events, sfreq, event_index, start, stop)
+        )
+
+    @staticmethod
+    def format_event_info(events, sfreq, event_id):
+        """Formats event information."""
+        return TableFormatter.event_table(events, sfreq, event_id).format_all()
+
+    @staticmethod
+    def format_stage_metrics(summary):
+        """Formats the stage durations and memory changes of a run (see StageMetrics.summary)."""
+        data = [
+            [
+                record['stage'],
+                f"{record['duration']:.3f}",
+                f"{record['memory_delta'] / 2 ** 20:+.1f}" if record['memory_delta'] is not None else '-'
+            ]
+            for record in summary['stages']
+        ]
+        header = (f"File: {summary.get('file', '-')}, channels: {summary.get('channels', '-')}, "
+                  f"segments: {summary.get('segments', '-')}\n"
+                  f"Total: {summary['total_duration']:.3f} sec\n")
+        return header + TableFormatter.format_table(data, ["Stage", "Duration (sec)", "Memory change (MB)"]) + "\n"
@@ -0,0 +1,46 @@
+# modules/text_output.py
+END = "end"  # Same value as tkinter.END, so text widgets and TextOutput share one interface
+
+
+class TextOutput:
+    """
+    In-memory replacement for a text widget, used when processing without a GUI.
+    Supports the subset of the ScrolledText interface used by EDFProcessor.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def delete(self, start, end=None):
+        """Clears the collected text."""
+        self.chunks = []
+
+    def insert(self, index, text):
+        """Appends text to the collected output."""
+        self.chunks.append(text)
+
+    def get_text(self):
+        """Returns the collected output as a single string."""
+        return ''.join(self.chunks)
+
+
+class QueueOutput:
+    """
+    Forwards output to a queue, so that a worker thread can write to a text widget
+    that is only updated from the GUI thread.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def delete(self, start, end=None):
+        """Queues clearing of the output."""
+        self.queue.put(('delete', None))
+
+    def insert(self, index, text):
+        """Queues text to be appended to the output."""
+        self.queue.put(('insert', text))
+
+    def insert_table(self, table):
+        """Queues a paged table, so that the GUI formats only the pages being displayed."""
+        self.queue.put(('table', table))
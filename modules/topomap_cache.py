@@ -0,0 +1,91 @@
+# modules/topomap_cache.py
+import hashlib
+import io
+import os
+from modules.file_cache import atomic_write
+
+CACHE_VERSION = 1  # Increase when the rendering of the topomap changes
+
+
+def render_topomap(montage):
+    """
+    Renders the topomap of a montage (channel positions seen from above, with names).
+
+    :param montage: DigMontage object.
+    :return: PNG image (bytes).
+    """
+    # Imported here, so opening files never loads the plotting libraries
+    import matplotlib.pyplot as plt
+    from mne.viz import plot_montage
+
+    fig = plot_montage(
+        montage,
+        kind='topomap',
+        show_names=True,  # Show channel names
+        sphere='auto',  # Automatically adjust sphere parameters
+        scale=1.2,  # Increase point size
+        show=False
+    )
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class TopomapCache:
+    """
+    Cache of rendered montage topomaps (PNG images), kept in memory and on disk and
+    keyed by the montage's channel names and positions, so each layout is rendered once.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Initializes the cache.
+
+        :param cache_dir: Directory for the image files.
+        """
+        self.cache_dir = cache_dir
+        self._images = {}  # Montage key -> PNG image
+
+    @staticmethod
+    def montage_key(montage):
+        """
+        Returns the cache key of a montage.
+
+        :param montage: DigMontage object.
+        :return: Hexadecimal key.
+        """
+        positions = montage.get_positions()
+        identity = [
+            CACHE_VERSION,
+            [(name, [round(float(x), 6) for x in pos]) for name, pos in positions['ch_pos'].items()]
+        ]
+        return hashlib.sha1(repr(identity).encode('utf-8')).hexdigest()
+
+    def get(self, montage):
+        """
+        Returns the topomap image of a montage, rendering it on first use.
+
+        :param montage: DigMontage object.
+        :return: PNG image (bytes).
+        """
+        key = self.montage_key(montage)
+        if key in self._images:
+            return self._images[key]
+
+        path = os.path.join(self.cache_dir, f"{key}.png")
+        try:
+            with open(path, 'rb') as f:
+                image = f.read()
+        except OSError:
+            image = render_topomap(montage)
+            try:
+                with atomic_write(path) as tmp_path:
+                    with open(tmp_path, 'wb') as f:
+                        f.write(image)
+            except OSError:
+                pass  # The image is still cached in memory
+        self._images[key] = image
+        return image
@@ -1,92 +1,200 @@
 # montage_manager.py
+import math
 import mne
 import numpy as np
 
+# Channel names and coordinates of the built-in layouts
+CHANNELS_10 = ['EEG F3', 'EEG F4', 'EEG C3', 'EEG C4', 'EEG P3', 'EEG P4', 'EEG O1', 'EEG O2', 'EEG A2', 'EEG A1']
+COORDS_10 = [
+    [-0.05, 0.0375, 0.06], [0.05, 0.0375, 0.06],  # F3, F4
+    [-0.05, 0.0, 0.1], [0.05, 0.0, 0.1],  # C3, C4
+    [-0.05, -0.0375, 0.08], [0.05, -0.0375, 0.08],  # P3, P4
+    [-0.05, -0.075, 0.05], [0.05, -0.075, 0.05],  # O1, O2
+    [0.1, 0.0, -0.002], [-0.1, 0.0, -0.002]  # A2, A1
+]
+
+CHANNELS_20 = [
+    'EEG FP1-A1', 'EEG FP2-A2', 'EEG F3-A1', 'EEG F4-A2',
+    'EEG C3-A1', 'EEG C4-A2', 'EEG P3-A1', 'EEG P4-A2',
+    'EEG O1-A1', 'EEG O2-A2', 'EEG F7-A1', 'EEG F8-A2',
+    'EEG T3-A1', 'EEG T4-A2', 'EEG T5-A1', 'EEG T6-A2',
+    'EEG FZ-A2', 'EEG CZ-A1', 'EEG PZ-A2'
+]
+COORDS_20 = [
+    [-0.05, 0.075, 0.05], [0.05, 0.075, 0.05],  # Fp1, Fp2
+    [-0.05, 0.0375, 0.06], [0.05, 0.0375, 0.06],  # F3, F4
+    [-0.05, 0.0, 0.1], [0.05, 0.0, 0.1],  # C3, C4
+    [-0.05, -0.0375, 0.08], [0.05, -0.0375, 0.08],  # P3, P4
+    [-0.05, -0.075, 0.05], [0.05, -0.075, 0.05],  # O1, O2
+    [-0.075, 0.0375, 0.06], [0.075, 0.0375, 0.06],  # F7, F8
+    [-0.075, 0.0, 0.1], [0.075, 0.0, 0.1],  # T3, T4
+    [-0.075, -0.0375, 0.08], [0.075, -0.0375, 0.08],  # T5, T6
+    [0.0, 0.0375, 0.06],  # Fz
+    [0.0, 0.0, 0.1],  # Cz
+    [0.0, -0.0375, 0.08]  # Pz
+]
+
+# Old 10-20 names and their 10-10 equivalents
+CHANNEL_ALIASES = {'T3': 'T7', 'T4': 'T8', 'T5': 'P7', 'T6': 'P8'}
+
+
 class MontageManager:
     """
     A class for managing montages (electrode layouts) for EEG data.
-    Supports creating montages for 10 and 20 channels.
+
+    Layouts are kept in a registry. Each layout is built once and cached for the lifetime
+    of the process, and recordings are matched to layouts by normalized channel names
+    (e.g. 'EEG FP1-A1' and 'Fp1' are the same electrode), not by channel count.
     """
 
+    MIN_MATCH_RATIO = 0.8  # Share of the recording's channels a layout must contain to be applied
+
+    _layouts = {}  # Layout name -> function building its DigMontage (in priority order)
+    _montages = {}  # Layout name -> DigMontage (built on first use)
+    _name_maps = {}  # Layout name -> {normalized channel name: channel name in the layout}
+    _matched_montages = {}  # (layout name, channel name pairs) -> DigMontage renamed to the recording's channels
+
     @staticmethod
-    def create_montage_10_channels():
+    def normalize_channel_name(ch_name):
         """
-        Creates a montage for 10-channel EEG.
-        Returns a DigMontage object with channel coordinates and names.
+        Normalizes a channel name for matching: removes the 'EEG' prefix and the reference
+        suffix, converts to upper case and maps old 10-20 names to 10-10 names.
+
+        :param ch_name: Channel name (e.g. 'EEG T3-A1').
+        :return: Normalized name (e.g. 'T7').
+        """
+        name = ch_name.strip().upper()
+        if name.startswith('EEG'):
+            name = name[3:]
+        name = name.strip(' -_').split('-')[0].strip()
+        return CHANNEL_ALIASES.get(name, name)
+
+    @staticmethod
+    def build_montage(ch_names, coords):
         """
-        ch_n = ['EEG F3', 'EEG F4', 'EEG C3', 'EEG C4', 'EEG P3', 'EEG P4', 'EEG O1', 'EEG O2', 'EEG A2', 'EEG A1']
-        ch_c = np.array([
-            [-0.05, 0.0375, 0.06], [0.05, 0.0375, 0.06],  # F3, F4
-            [-0.05, 0.0, 0.1], [0.05, 0.0, 0.1],  # C3, C4
-            [-0.05, -0.0375, 0.08], [0.05, -0.0375, 0.08],  # P3, P4
-            [-0.05, -0.075, 0.05], [0.05, -0.075, 0.05],  # O1, O2
-            [0.1, 0.0, -0.002], [-0.1, 0.0, -0.002]  # A2, A1
-        ])
+        Builds a DigMontage from channel names and head coordinates.
 
+        :param ch_names: Channel names.
+        :param coords: Channel coordinates (in meters, head coordinate frame).
+        :return: DigMontage object.
+        """
         dig_pts = [
             dict(ident=i + 1, ch_name=name, r=coord,
                  kind=mne.io.constants.FIFF.FIFFV_POINT_EEG,
                  coord_frame=mne.io.constants.FIFF.FIFFV_COORD_HEAD)
-            for i, (name, coord) in enumerate(zip(ch_n, ch_c))
+            for i, (name, coord) in enumerate(zip(ch_names, np.array(coords)))
         ]
 
-        return mne.channels.DigMontage(dig=dig_pts, ch_names=ch_n)
+        return mne.channels.DigMontage(dig=dig_pts, ch_names=list(ch_names))
 
-    @staticmethod
-    def create_montage_20_channels():
+    @classmethod
+    def register_layout(cls, name, factory):
         """
-        Creates a montage for 20-channel EEG (without ECG).
-        Returns a DigMontage object with channel coordinates and names.
+        Registers a layout. Registration is cheap: the montage is built on first use.
+        Layouts registered earlier take priority when several match equally well.
+
+        :param name: Layout name.
+        :param factory: Function without arguments returning the layout's DigMontage.
         """
-        ch_n = [
-            'EEG FP1-A1', 'EEG FP2-A2', 'EEG F3-A1', 'EEG F4-A2',
-            'EEG C3-A1', 'EEG C4-A2', 'EEG P3-A1', 'EEG P4-A2',
-            'EEG O1-A1', 'EEG O2-A2', 'EEG F7-A1', 'EEG F8-A2',
-            'EEG T3-A1', 'EEG T4-A2', 'EEG T5-A1', 'EEG T6-A2',
-            'EEG FZ-A2', 'EEG CZ-A1', 'EEG PZ-A2'
-        ]
+        cls._layouts[name] = factory
+        cls._montages.pop(name, None)
+        cls._name_maps.pop(name, None)
+        cls._matched_montages = {key: m for key, m in cls._matched_montages.items() if key[0] != name}
 
-        ch_c = np.array([
-            [-0.05, 0.075, 0.05], [0.05, 0.075, 0.05],  # Fp1, Fp2
-            [-0.05, 0.0375, 0.06], [0.05, 0.0375, 0.06],  # F3, F4
-            [-0.05, 0.0, 0.1], [0.05, 0.0, 0.1],  # C3, C4
-            [-0.05, -0.0375, 0.08], [0.05, -0.0375, 0.08],  # P3, P4
-            [-0.05, -0.075, 0.05], [0.05, -0.075, 0.05],  # O1, O2
-            [-0.075, 0.0375, 0.06], [0.075, 0.0375, 0.06],  # F7, F8
-            [-0.075, 0.0, 0.1], [0.075, 0.0, 0.1],  # T3, T4
-            [-0.075, -0.0375, 0.08], [0.075, -0.0375, 0.08],  # T5, T6
-            [0.0, 0.0375, 0.06],  # Fz
-            [0.0, 0.0, 0.1],  # Cz
-            [0.0, -0.0375, 0.08]  # Pz
-        ])
+    @classmethod
+    def get_layout(cls, name):
+        """
+        Returns the DigMontage of a registered layout (built once and cached).
 
-        dig_pts = [
-            dict(ident=i + 1, ch_name=name, r=coord,
-                 kind=mne.io.constants.FIFF.FIFFV_POINT_EEG,
-                 coord_frame=mne.io.constants.FIFF.FIFFV_COORD_HEAD)
-            for i, (name, coord) in enumerate(zip(ch_n, ch_c))
-        ]
+        :param name: Layout name.
+        :return: DigMontage object.
+        """
+        if name not in cls._montages:
+            montage = cls._layouts[name]()
+            cls._montages[name] = montage
+            cls._name_maps[name] = {cls.normalize_channel_name(ch): ch for ch in montage.ch_names}
+        return cls._montages[name]
 
-        return mne.channels.DigMontage(dig=dig_pts, ch_names=ch_n)
+    @classmethod
+    def match_layout(cls, ch_names):
+        """
+        Finds the registered layout containing the most channels of a recording.
 
-    @staticmethod
-    def get_montage(num_channels):
+        :param ch_names: Channel names of the recording.
+        :return: Tuple (layout name, {recording channel: layout channel}), or (None, {})
+                 if no layout contains at least MIN_MATCH_RATIO of the channels.
+        """
+        normalized = [(ch, cls.normalize_channel_name(ch)) for ch in ch_names]
+        best_name, best_match = None, {}
+        for name in cls._layouts:
+            cls.get_layout(name)
+            name_map = cls._name_maps[name]
+            match = {ch: name_map[norm] for ch, norm in normalized if norm in name_map}
+            if len(match) > len(best_match):
+                best_name, best_match = name, match
+            if len(match) == len(ch_names):
+                break  # Complete match; later layouts cannot do better
+
+        if not best_match or len(best_match) < math.ceil(cls.MIN_MATCH_RATIO * len(ch_names)):
+            return None, {}
+        return best_name, best_match
+
+    @classmethod
+    def get_montage(cls, ch_names):
         """
-        Returns a montage based on the number of channels.
+        Returns a montage for the channels of a recording.
 
         Parameters:
         ----------
-        num_channels : int
-            Number of channels (10 or 20).
+        ch_names : list of str
+            Channel names of the recording.
 
         Returns:
         -----------
         DigMontage or None
-            Montage for the specified number of channels or None if the number is not supported.
-        """
-        if num_channels in [10, 11]:
-            return MontageManager.create_montage_10_channels()
-        elif num_channels in [19, 20]:
-            return MontageManager.create_montage_20_channels()
-        else:
-            return None
\ No newline at end of file
+            Montage of the best matching layout, with its channels renamed to the
+            recording's channel names, or None if no registered layout matches.
+        """
+        layout_name, match = cls.match_layout(ch_names)
+        if layout_name is None:
+            return None
+
+        key = (layout_name, tuple(sorted(match.items())))
+        if key not in cls._matched_montages:
+            montage = cls.get_layout(layout_name)
+            if any(layout_ch != ch for ch, layout_ch in match.items()):
+                # Montage with only the matched channels, named as in the recording
+                positions = montage.get_positions()
+                montage = mne.channels.make_dig_montage(
+                    ch_pos={ch: positions['ch_pos'][layout_ch] for ch, layout_ch in match.items()},
+                    nasion=positions['nasion'],
+                    lpa=positions['lpa'],
+                    rpa=positions['rpa'],
+                    coord_frame=positions['coord_frame']
+                )
+            cls._matched_montages[key] = montage
+        return cls._matched_montages[key]
+
+    @staticmethod
+    def create_montage_10_channels():
+        """
+        Creates a montage for 10-channel EEG.
+        Returns a DigMontage object with channel coordinates and names.
+        """
+        return MontageManager.build_montage(CHANNELS_10, COORDS_10)
+
+    @staticmethod
+    def create_montage_20_channels():
+        """
+        Creates a montage for 20-channel EEG (without ECG).
+        Returns a DigMontage object with channel coordinates and names.
+        """
+        return MontageManager.build_montage(CHANNELS_20, COORDS_20)
+
+
+# Built-in layouts: the clinic's 10- and 19/20-channel caps, then the standard 10-20
+# (covers 32-channel caps) and 10-05 (covers 64-channel caps) systems
+MontageManager.register_layout('10-channel', MontageManager.create_montage_10_channels)
+MontageManager.register_layout('20-channel', MontageManager.create_montage_20_channels)
+MontageManager.register_layout('standard_1020', lambda: mne.channels.make_standard_montage('standard_1020'))
+MontageManager.register_layout('standard_1005', lambda: mne.channels.make_standard_montage('standard_1005'))
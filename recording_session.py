@@ -0,0 +1,149 @@
+# recording_session.py
+import os
+from collections import OrderedDict
+from config.settings import settings
+from modules.logger import setup_logger
+from modules.text_output import END
+
+# Logger setup
+logger = setup_logger()
+
+
+class RecordingSession:
+    """
+    Keeps several recordings open at once, each in its own EDFProcessor.
+
+    The samples of all recordings share a memory budget: when it is exceeded, the samples
+    of the least recently used recordings are released, while their metadata, events and
+    segment tables stay in memory. An evicted recording reads its samples from disk on
+    demand and loads them again when it becomes the active recording.
+
+    The processing modules (MNE, SciPy) are imported when the first processor is created,
+    so creating a session is cheap (see warm_up).
+    """
+
+    def __init__(self, output_widget=None, progress_callback=None, memory_budget=None):
+        """
+        Initializes the session.
+
+        :param output_widget: Widget for text output, shared by the recordings (see EDFProcessor).
+        :param progress_callback: Progress reporting function (see EDFProcessor).
+        :param memory_budget: Maximum size of the samples kept in memory (in bytes);
+                              settings.SESSION_MEMORY_BUDGET if None.
+        """
+        self.output_widget = output_widget
+        self.progress_callback = progress_callback
+        self.memory_budget = memory_budget if memory_budget is not None else settings.SESSION_MEMORY_BUDGET
+        self.recordings = OrderedDict()  # File path -> EDFProcessor, least recently used first
+        self.active_path = None  # File path of the active recording
+        self._empty = None  # Processor used while no recording is open (created on first use)
+
+    @staticmethod
+    def warm_up():
+        """
+        Imports the processing modules, so the first file opens without waiting for them
+        (e.g. on a background thread after the window appears).
+        """
+        import edf_processor  # Imports MNE, SciPy and the montage registry
+
+    def _create_processor(self):
+        """
+        Creates a processor sharing the session's output and progress reporting.
+        """
+        from edf_processor import EDFProcessor
+
+        return EDFProcessor(self.output_widget, self.progress_callback)
+
+    @property
+    def active(self):
+        """
+        Processor of the active recording (a processor without a file if none is open).
+        """
+        if self.active_path is None:
+            if self._empty is None:
+                self._empty = self._create_processor()
+            return self._empty
+        return self.recordings[self.active_path]
+
+    def open(self, file_path):
+        """
+        Opens a recording and makes it the active one. A recording that is already open
+        is activated instead of being loaded again.
+
+        :param file_path: Path to the EDF file.
+        """
+        file_path = os.path.abspath(file_path)
+        if file_path in self.recordings:
+            self.activate(file_path)
+            return
+
+        previous_path = self.active_path
+        processor = self._create_processor()
+        self.recordings[file_path] = processor
+        self.active_path = file_path
+        try:
+            processor.load_metadata(file_path)
+        except Exception:
+            del self.recordings[file_path]
+            self.active_path = previous_path
+            raise
+        self._evict()
+
+    def activate(self, file_path):
+        """
+        Makes an open recording the active one, loading its samples again if they were
+        released, and outputs its events (and segments, if it was split).
+
+        :param file_path: Path of an open recording.
+        """
+        processor = self.recordings[file_path]
+        self.recordings.move_to_end(file_path)
+        self.active_path = file_path
+
+        processor.reload_data()
+        self._evict()
+
+        processor.output_widget.delete(1.0, END)
+        processor.output_widget.insert(END, f"Recording: {file_path}\n")
+        if processor.seg_dict:
+            processor.output_results()
+        else:
+            processor.output_event_info(processor.raw.info['sfreq'])
+
+    def close(self, file_path):
+        """
+        Closes a recording.
+
+        :param file_path: Path of an open recording.
+        """
+        del self.recordings[file_path]
+        if self.active_path == file_path:
+            self.active_path = next(reversed(self.recordings), None)
+
+    def cancel(self):
+        """
+        Requests cancellation of the running operation (see EDFProcessor.cancel).
+        """
+        self.active.cancel()
+
+    def memory_usage(self):
+        """
+        Returns the size of the samples held in memory by all recordings (in bytes).
+        """
+        return sum(processor.data_size() for processor in self.recordings.values())
+
+    def _evict(self):
+        """
+        Releases the samples of the least recently used recordings until the session
+        fits in the memory budget. The active recording is never evicted.
+        """
+        usage = self.memory_usage()
+        for file_path, processor in self.recordings.items():
+            if usage <= self.memory_budget:
+                break
+            size = processor.data_size()
+            if file_path == self.active_path or not size:
+                continue
+            processor.unload_data()
+            usage -= size
+            logger.info(f"Released the samples of {file_path} ({size / 2 ** 20:.1f} MB) to stay within the session memory budget")